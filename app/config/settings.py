@@ -0,0 +1,49 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    GOOGLE_API_KEY: str
+    GOOGLE_GENAI_USE_VERTEXAI: str
+    MCP_SERVER_URL: str
+    OPENSEARCH_HOST: str
+    OPENSEARCH_PORT: int
+    OPENSEARCH_USERNAME: str
+    OPENSEARCH_PASSWORD: str
+    # Embedding model of the agents / tools indices
+    EMBEDDING_MODEL: str = "qwen3-embedding:0.6b"
+    # Same keep alive as the MCP server, a request without one would reset
+    # the model to ollama's 5 minute default
+    EMBEDDING_KEEP_ALIVE: int = -1
+    REEMBED_BATCH_SIZE: int = 64
+    # Orchestrator history compaction
+    ORCHESTRATOR_KEEP_TURNS: int = 4
+    ORCHESTRATOR_TOKEN_BUDGET: int = 16000
+    # Deadline of an orchestrator run
+    ORCHESTRATOR_DEADLINE_SECONDS: float = 120
+    # Speculative agent / tool search started with every orchestrator run
+    PREFETCH_ENABLED: bool = True
+    PREFETCH_MIN_SIMILARITY: float = 0.3
+    # Admission control in front of /invoke_agent
+    ADMISSION_MAX_IN_FLIGHT: int = 32
+    ADMISSION_MIN_IN_FLIGHT: int = 2
+    ADMISSION_MAX_PER_USER: int = 4
+    ADMISSION_MAX_QUEUE: int = 128
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30
+    ADMISSION_TARGET_LATENCY_SECONDS: float = 20
+
+    # Interval of the periodic warm-up after startup
+    WARMUP_INTERVAL_SECONDS: float = 300
+    STARTUP_RETRY_SECONDS: float = 5
+    # Record / replay of outbound calls, see service/cassette_service.py
+    CASSETTE_MODE: str = "off"  # off | record | replay
+    CASSETTE_DIR: str = "cassettes"
+    CASSETTE_REPLAY_TIMING: str = "zero"  # original | zero
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+@lru_cache
+def get_settings():
+    return Settings()
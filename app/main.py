@@ -1,23 +1,49 @@
-# import asyncio
-import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Literal
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from google.adk.agents.llm_agent import Agent
+from fastapi.responses import JSONResponse
 
-# from google.adk.apps import App
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.mcp_tool import McpToolset, StreamableHTTPConnectionParams
-from google.genai import types
-from opensearchpy import AsyncOpenSearch
-
-from app.schema.agent_message import AgentMessage
+from app.config.settings import get_settings
+from app.service.admission_service import (
+    AdmissionRejected,
+    get_admission_controller,
+)
+from app.service.agent_service import get_root_agent, run_remote_agent
+from app.service.index_service import (
+    build_document,
+    build_update,
+    get_raw_documents,
+    missing_fields,
+    reembed_jobs,
+    split_names,
+    start_reembed,
+    start_tool_migration,
+    tool_doc_id,
+    tool_migration,
+)
+from app.service.opensearch_service import opensearch_client
+from app.service.prefetch_service import discovery_prefetch
+from app.service.prefetch_service import snapshot as prefetch_snapshot
+from app.service.startup_service import is_ready, keep_warm
+from shared.service.deadline_service import deadline
 
 load_dotenv()
 
-app = FastAPI(title="Agent Factory")
+
+# Heavy sdks and clients are prepared and warmed up in the background,
+# readiness flips after the first warm-up
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_task = asyncio.create_task(keep_warm())
+    yield
+    startup_task.cancel()
+
+
+app = FastAPI(title="Agent Factory", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,127 +53,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Loading all the .env variable
-os.environ["GOOGLE_API_KEY"] = os.environ.get("GOOGLE_API_KEY")
-os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = os.environ.get("GOOGLE_GENAI_USE_VERTEXAI")
-MCP_SERVER_URL = os.environ.get("MCP_SERVER_URL")
-OPENSEARCH_HOST = os.environ.get("OPENSEARCH_HOST")
-OPENSEARCH_PORT = int(os.environ.get("OPENSEARCH_PORT"))
-OPENSEARCH_USERNAME = os.environ.get("OPENSEARCH_USERNAME")
-OPENSEARCH_PASSWORD = os.environ.get("OPENSEARCH_PASSWORD")
-
 
-# Initalizing the agent manager
-toolset = McpToolset(
-    connection_params=StreamableHTTPConnectionParams(url=MCP_SERVER_URL),
-    tool_filter=["create_agent", "tool_search", "search_agent", "call_agent"],
-)
-session_service = InMemorySessionService()
-
-
-# Orchestrator agent
-root_agent = Agent(
-    model="gemini-2.5-flash",
-    name="orchestrator_agent",
-    description="Agent who is responsible for creating and managing all the agents",
-    instruction="""
-            Execution Flow
-                Search for a suitable existing agent.
-                If found → invoke the agent with required parameters.
-                If not found → search for required tools.
-                If any required tools are missing → return a tool creation request.
-            Create a new agent only if:
-                No suitable agent exists, and
-                All required tools are available.
-                Do not create agents for tasks that can be handled directly.
-                Never invoke unavailable agents.
-            Output Rules
-                Return only the final decision and action taken.
-                No reasoning, explanations, or extra text.
-                Response must be concise, deterministic, and unambiguous.""",
-    tools=[toolset],
-    generate_content_config=types.GenerateContentConfig(temperature=0.0),
-)
+# Liveness probe
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
 
 
-# Agent Executor
-class AgentExecutor:
-    def __init__(self, app_name, session_service: InMemorySessionService, agent: Agent):
-        self.app_name = app_name
-        self.session_service = session_service
-        self.agent = agent
+# Readiness probe, only ready once the orchestrator is built and warmed up
+@app.get("/readyz")
+async def readyz():
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
 
-    async def execute(self, message: AgentMessage):
-        session_id = message.session_id
-        user_id = message.user_id
 
-        # CREATE OR RETRIEVE SESSION
-        session = await self.session_service.get_session(
-            app_name=self.app_name, user_id=user_id, session_id=session_id
-        )
-
-        if not session:
-            session = await self.session_service.create_session(
-                app_name=self.app_name, user_id=user_id, session_id=session_id
-            )
-
-        # CREATE RUNNER USING THE SAME SESSION SERVICE
-        runner = Runner(
-            agent=self.agent,
-            app_name=self.app_name,
-            session_service=self.session_service,
-        )
-
-        # RUN THE AGENT
-        content = types.Content(role="user", parts=[types.Part(text=message.query)])
-        events = runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=content,
+# Chat Route
+@app.post("/invoke_agent")
+async def invoke_agent(
+    session_id: str,
+    user_id: str,
+    query: str,
+    priority: Literal["high", "normal", "low"] = "normal",
+):
+    try:
+        async with get_admission_controller().admit(user_id=user_id, priority=priority):
+            # Model and tool calls of the run share one deadline, discovery
+            # searches start right away next to the first model turn
+            async with deadline(get_settings().ORCHESTRATOR_DEADLINE_SECONDS):
+                async with discovery_prefetch(query=query):
+                    return await run_remote_agent(
+                        remote_agent=get_root_agent(),
+                        session_id=session_id,
+                        user_id=user_id,
+                        query=query,
+                    )
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Orchestrator run timed out")
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429,
+            detail=exc.reason,
+            headers={"Retry-After": str(exc.retry_after)},
         )
 
-        agent_response = {}
-        async for event in events:
-            if event.get_function_calls():
-                agent_response["function_calls"] = event.get_function_calls()
-            elif event.get_function_responses():
-                agent_response["function_responses"] = event.get_function_responses()
-            elif event.is_final_response():
-                agent_response["final_response"] = event.content.parts[0].text
-
-        return agent_response
 
+# Queue depth and wait time of the admission layer, used for autoscaling
+@app.get("/metrics/admission")
+async def admission_metrics():
+    return get_admission_controller().snapshot()
 
-async def run_remote_agent(
-    remote_agent: Agent, session_id: str, user_id: str, query: str
-):
-    agent_runner = AgentExecutor(
-        app_name="remote_agents", session_service=session_service, agent=remote_agent
-    )
-    response = await agent_runner.execute(
-        message=AgentMessage(session_id=session_id, user_id=user_id, query=query)
-    )
-    return response
 
-
-# Chat Route
-@app.post("/invoke_agent")
-async def invoke_agent(session_id: str, user_id: str, query: str):
-    return await run_remote_agent(
-        remote_agent=root_agent, session_id=session_id, user_id=user_id, query=query
-    )
+# Hit rate of the speculative discovery prefetch
+@app.get("/metrics/prefetch")
+async def prefetch_metrics():
+    return prefetch_snapshot()
 
 
 # Get all agents available
 @app.get("/get_all_agents")
 async def get_all_remote_agents():
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
+    async with opensearch_client() as client:
         index_exists = await client.indices.exists(index="agents")
         if not index_exists:
             return []
@@ -166,13 +132,7 @@ async def get_all_remote_agents():
 
 @app.get("/get_all_tools")
 async def get_all_remote_tools():
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
+    async with opensearch_client() as client:
         index_exists = await client.indices.exists(index="agents")
         if not index_exists:
             return []
@@ -189,123 +149,147 @@ async def get_all_remote_tools():
         return [hit["_source"]["raw"] for hit in hits]
 
 
+# Hydrate many agents in one round trip, names are comma separated or repeated
+@app.get("/agents")
+async def get_agents(names: List[str] = Query(...)):
+    return await get_raw_documents(index="agents", doc_ids=split_names(names))
+
+
+@app.get("/tools")
+async def get_tools(names: List[str] = Query(...)):
+    return await get_raw_documents(
+        index="tools", doc_ids=[tool_doc_id(name) for name in split_names(names)]
+    )
+
+
+# The search text needs these fields, refuse the body instead of failing on it
+def validate_raw(index: str, raw: dict):
+    missing = missing_fields(index=index, raw=raw)
+    if missing:
+        raise HTTPException(
+            status_code=422, detail=f"Missing or invalid fields: {', '.join(missing)}"
+        )
+
+
+# Index a tool under its deterministic id, re-ingesting replaces it
+@app.put("/tools/{name}")
+async def index_tool(name: str, raw: dict):
+    raw = {**raw, "name": name}
+    validate_raw(index="tools", raw=raw)
+    async with opensearch_client() as client:
+        doc = await build_document(index="tools", raw=raw)
+        response = await client.index(index="tools", id=tool_doc_id(name), body=doc)
+        return {"result": response["result"], "id": response["_id"]}
+
+
 @app.delete("/delete_agent/{name}")
 async def delete_agent(name: str):
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
-        res = await client.search(
-            index="agents", body={"query": {"term": {"raw.agent_name.keyword": name}}}
-        )
+    from opensearchpy import NotFoundError
 
-        hits = res["hits"]["hits"]
-        if not hits:
+    async with opensearch_client() as client:
+        try:
+            response = await client.delete(index="agents", id=name)
+        except NotFoundError:
             raise HTTPException(status_code=404, detail="Agent not found")
 
-        deleted_docs = []
-        for hit in hits:
-            doc_id = hit["_id"]
-            response = await client.delete(index="agents", id=doc_id)
-            deleted_docs.append({"id": doc_id, "response": response})
-
-        return {"result": "deleted", "docs": deleted_docs}
+        return {"result": "deleted", "docs": [{"id": name, "response": response}]}
 
 
 @app.delete("/delete_tool/{name}")
 async def delete_tool(name: str):
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
-        # 1) Search for docs where raw.name matches (no nested)
-        res = await client.search(
-            index="tools",
-            body={
-                "query": {
-                    "term": {"raw.name.keyword": name}  # exact match
-                }
-            },
-            size=100,
-        )
+    from opensearchpy import NotFoundError
 
-        hits = res["hits"]["hits"]
-        if not hits:
+    async with opensearch_client() as client:
+        doc_id = tool_doc_id(name)
+        try:
+            response = await client.delete(index="tools", id=doc_id)
+        except NotFoundError:
             raise HTTPException(status_code=404, detail="Tool not found")
 
-        # 2) Delete each matching doc
-        deletes = []
-        for hit in hits:
-            doc_id = hit["_id"]
-            resp = await client.delete(index="tools", id=doc_id)
-            deletes.append({"id": doc_id, "result": resp})
-
-        return {"deleted": deletes}
+        return {"deleted": [{"id": doc_id, "result": response}]}
 
 
 @app.put("/update_agent/{name}")
 async def update_agent(name: str, raw: dict):
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
-        res = await client.search(
-            index="agents",
-            body={"query": {"term": {"raw.agent_name.keyword": name}}},
-            size=1,
-        )
-
-        hits = res["hits"]["hits"]
-        if not hits:
+    from opensearchpy import NotFoundError
+
+    # The name is the id, the body can not rename the agent
+    raw = {**raw, "agent_name": name}
+    validate_raw(index="agents", raw=raw)
+    async with opensearch_client() as client:
+        try:
+            current = await client.get(
+                index="agents",
+                id=name,
+                _source_includes=["search_text", "content_hash"],
+            )
+        except NotFoundError:
             raise HTTPException(status_code=404, detail="Agent not found")
 
-        doc_id = hits[0]["_id"]
-        updated = await client.update(
-            index="agents", id=doc_id, body={"doc": {"raw": raw}}
-        )
+        # search_text / embedding are only recomputed when the text changed
+        doc = await build_update(index="agents", raw=raw, source=current["_source"])
+        updated = await client.update(index="agents", id=name, body={"doc": doc})
 
-        return {"result": "updated", "id": doc_id, "update_response": updated}
+        return {"result": "updated", "id": name, "update_response": updated}
 
 
 @app.put("/update_tool/{name}")
 async def update_tool(name: str, raw: dict):
-    async with AsyncOpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
-        # 1) Search by exact tool_name
-        res = await client.search(
-            index="tools",
-            body={"query": {"term": {"raw.name.keyword": name}}},
-            size=1,
-        )
-
-        hits = res["hits"]["hits"]
-        if not hits:
+    from opensearchpy import NotFoundError
+
+    raw = {**raw, "name": name}
+    validate_raw(index="tools", raw=raw)
+    async with opensearch_client() as client:
+        doc_id = tool_doc_id(name)
+        try:
+            current = await client.get(
+                index="tools",
+                id=doc_id,
+                _source_includes=["search_text", "content_hash"],
+            )
+        except NotFoundError:
             raise HTTPException(status_code=404, detail="Tool not found")
 
-        doc_id = hits[0]["_id"]
-
-        # 2) Update only raw
+        # Update raw, re-embed only when the searchable text changed
+        doc = await build_update(index="tools", raw=raw, source=current["_source"])
         update_response = await client.update(
-            index="tools", id=doc_id, body={"doc": {"raw": raw}}
+            index="tools", id=doc_id, body={"doc": doc}
         )
 
         return {"result": "updated", "id": doc_id, "update_response": update_response}
 
 
+# Re-embed a whole index in the background, e.g. after an embedding model swap
+@app.post("/reembed/{index}")
+async def reembed(index: Literal["agents", "tools"], force: bool = False):
+    if not start_reembed(index=index, force=force):
+        raise HTTPException(status_code=409, detail="Re-embedding already running")
+    return {"result": "started", "index": index}
+
+
+@app.get("/reembed/{index}")
+async def reembed_status(index: Literal["agents", "tools"]):
+    if index not in reembed_jobs:
+        raise HTTPException(status_code=404, detail="No re-embedding job")
+    return reembed_jobs[index]
+
+
+# One-off move of tools indexed with generated ids under their name, run once
+# after upgrading so the by-name endpoints find every tool
+@app.post("/migrate_tools")
+async def migrate_tools():
+    if not start_tool_migration():
+        raise HTTPException(status_code=409, detail="Migration already running")
+    return {"result": "started"}
+
+
+@app.get("/migrate_tools")
+async def migrate_tools_status():
+    if not tool_migration:
+        raise HTTPException(status_code=404, detail="No migration job")
+    return tool_migration
+
+
 if __name__ == "__main__":
     import uvicorn
 
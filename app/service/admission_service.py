@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from app.config.settings import get_settings
+
+# Lower value is served first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+# Weight of the newest sample in the latency / error moving averages
+EWMA_ALPHA = 0.2
+# Error rate above which the concurrency limit shrinks
+MAX_ERROR_RATE = 0.2
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# Global + per user in flight limits with a bounded priority queue in front.
+# The global limit adapts: additive increase while upstream is healthy,
+# multiplicative decrease when latency or error rate goes above target.
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int,
+        min_in_flight: int,
+        max_per_user: int,
+        max_queue: int,
+        queue_timeout: float,
+        target_latency: float,
+    ):
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.per_user = Counter()
+        self._queue = []
+        self._sequence = itertools.count()
+
+        self.latency_ewma = 0.0
+        self.error_rate = 0.0
+        self.rejected_total = 0
+        self.wait_times = deque(maxlen=512)
+
+    def retry_after(self):
+        expected_latency = self.latency_ewma or self.target_latency
+        waves = (self.queued + 1) / max(int(self.limit), 1)
+        return max(1, math.ceil(expected_latency * waves))
+
+    def _reject(self, reason: str):
+        self.rejected_total += 1
+        raise AdmissionRejected(reason=reason, retry_after=self.retry_after())
+
+    async def _acquire(self, user_id: str, priority: str):
+        if self.per_user[user_id] >= self.max_per_user:
+            self._reject("too many requests in flight for this user")
+
+        enqueued_at = time.monotonic()
+        if not self._queue and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self.per_user[user_id] += 1
+            self.wait_times.append(0.0)
+            return
+
+        if self.queued >= self.max_queue:
+            self._reject("server is saturated")
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue,
+            (PRIORITIES[priority], next(self._sequence), waiter),
+        )
+        self.queued += 1
+        self.per_user[user_id] += 1
+        # Clears out abandoned waiters, may admit this one straight away
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            self.per_user[user_id] -= 1
+            if self.per_user[user_id] <= 0:
+                del self.per_user[user_id]
+            if waiter.done() and not waiter.cancelled():
+                # Got a slot at the same moment, hand it to the next waiter
+                self.in_flight -= 1
+                self._dispatch()
+            else:
+                self.queued -= 1
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            # Timed out waits count too, or the wait metrics hide saturation
+            self.wait_times.append(time.monotonic() - enqueued_at)
+            self._reject("timed out waiting in queue")
+        self.wait_times.append(time.monotonic() - enqueued_at)
+
+    def _dispatch(self):
+        while self._queue and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                continue
+            self.queued -= 1
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _adapt(self, latency: float, failed: bool):
+        self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        self.error_rate += EWMA_ALPHA * (float(failed) - self.error_rate)
+        if self.latency_ewma > self.target_latency or self.error_rate > MAX_ERROR_RATE:
+            self.limit = max(float(self.min_in_flight), self.limit * 0.9)
+        else:
+            self.limit = min(float(self.max_in_flight), self.limit + 1 / self.limit)
+
+    def _release(self, user_id: str, latency: float, failed: bool):
+        self.in_flight -= 1
+        self.per_user[user_id] -= 1
+        if self.per_user[user_id] <= 0:
+            del self.per_user[user_id]
+        self._adapt(latency=latency, failed=failed)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, user_id: str, priority: str = "normal"):
+        await self._acquire(user_id=user_id, priority=priority)
+        started_at = time.monotonic()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(
+                user_id=user_id,
+                latency=time.monotonic() - started_at,
+                failed=failed,
+            )
+
+    # Exposed for autoscaling
+    def snapshot(self):
+        wait_times = sorted(self.wait_times)
+        p95_wait = wait_times[int(len(wait_times) * 0.95) - 1] if wait_times else 0.0
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "avg_wait_seconds": sum(wait_times) / len(wait_times) if wait_times else 0,
+            "p95_wait_seconds": p95_wait,
+            "latency_ewma_seconds": self.latency_ewma,
+            "error_rate": self.error_rate,
+            "rejected_total": self.rejected_total,
+        }
+
+
+@lru_cache
+def get_admission_controller():
+    settings = get_settings()
+    return AdmissionController(
+        max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+        min_in_flight=settings.ADMISSION_MIN_IN_FLIGHT,
+        max_per_user=settings.ADMISSION_MAX_PER_USER,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        target_latency=settings.ADMISSION_TARGET_LATENCY_SECONDS,
+    )
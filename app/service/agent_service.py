@@ -0,0 +1,157 @@
+import os
+from contextlib import aclosing
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.config.settings import get_settings
+from app.schema.agent_message import AgentMessage
+from app.service.cassette_service import (
+    cassette_toolset,
+    record_model_call,
+    replay_model_call,
+)
+from app.service.compaction_service import compact_session_history
+from app.service.prefetch_service import answer_from_prefetch
+from shared.service.deadline_service import apply_deadline
+
+# The adk / genai sdks are heavy, they are only imported when the agent is built
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.sessions import InMemorySessionService
+
+ORCHESTRATOR_INSTRUCTION = """
+            Execution Flow
+                Search for a suitable existing agent.
+                If found → invoke the agent with required parameters.
+                For many inputs or several agents at once → use call_agents.
+                If not found → search for required tools.
+                If any required tools are missing → return a tool creation request.
+            Create a new agent only if:
+                No suitable agent exists, and
+                All required tools are available.
+                Do not create agents for tasks that can be handled directly.
+                Never invoke unavailable agents.
+            Output Rules
+                Return only the final decision and action taken.
+                No reasoning, explanations, or extra text.
+                Response must be concise, deterministic, and unambiguous."""
+
+
+# Session service shared by every run of the app
+@lru_cache
+def get_session_service() -> "InMemorySessionService":
+    from google.adk.sessions import InMemorySessionService
+
+    return InMemorySessionService()
+
+
+# Orchestrator agent, built on first use
+@lru_cache
+def get_root_agent() -> "Agent":
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.tools.mcp_tool import McpToolset, StreamableHTTPConnectionParams
+    from google.genai import types
+
+    # Loading all the .env variable
+    os.environ["GOOGLE_API_KEY"] = get_settings().GOOGLE_API_KEY
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = get_settings().GOOGLE_GENAI_USE_VERTEXAI
+
+    # Initalizing the agent manager
+    url = get_settings().MCP_SERVER_URL
+    toolset = McpToolset(
+        connection_params=StreamableHTTPConnectionParams(url=url),
+        tool_filter=[
+            "create_agent",
+            "tool_search",
+            "search_agent",
+            "call_agent",
+            "call_agents",
+        ],
+    )
+
+    return Agent(
+        model="gemini-2.5-flash",
+        name="orchestrator_agent",
+        description="Agent who is responsible for creating and managing all the agents",
+        instruction=ORCHESTRATOR_INSTRUCTION,
+        tools=[cassette_toolset(toolset, url=url)],
+        generate_content_config=types.GenerateContentConfig(temperature=0.0),
+        before_model_callback=[
+            compact_session_history,
+            apply_deadline,
+            replay_model_call,
+        ],
+        after_model_callback=record_model_call,
+        before_tool_callback=answer_from_prefetch,
+    )
+
+
+# Agent Executor
+class AgentExecutor:
+    def __init__(
+        self, app_name, session_service: "InMemorySessionService", agent: "Agent"
+    ):
+        self.app_name = app_name
+        self.session_service = session_service
+        self.agent = agent
+
+    async def execute(self, message: AgentMessage):
+        from google.adk.runners import Runner
+        from google.genai import types
+
+        session_id = message.session_id
+        user_id = message.user_id
+
+        # CREATE OR RETRIEVE SESSION
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+
+        if not session:
+            session = await self.session_service.create_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+
+        # CREATE RUNNER USING THE SAME SESSION SERVICE
+        runner = Runner(
+            agent=self.agent,
+            app_name=self.app_name,
+            session_service=self.session_service,
+        )
+
+        # RUN THE AGENT
+        content = types.Content(role="user", parts=[types.Part(text=message.query)])
+        events = runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+        )
+
+        agent_response = {}
+        # Closing the events on cancellation tears down the run
+        async with aclosing(events):
+            async for event in events:
+                if event.get_function_calls():
+                    agent_response["function_calls"] = event.get_function_calls()
+                elif event.get_function_responses():
+                    agent_response["function_responses"] = (
+                        event.get_function_responses()
+                    )
+                elif event.is_final_response():
+                    agent_response["final_response"] = event.content.parts[0].text
+
+        return agent_response
+
+
+async def run_remote_agent(
+    remote_agent: "Agent", session_id: str, user_id: str, query: str
+):
+    agent_runner = AgentExecutor(
+        app_name="remote_agents",
+        session_service=get_session_service(),
+        agent=remote_agent,
+    )
+    response = await agent_runner.execute(
+        message=AgentMessage(session_id=session_id, user_id=user_id, query=query)
+    )
+    return response
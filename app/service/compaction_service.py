@@ -0,0 +1,145 @@
+import json
+from typing import List
+
+from app.config.settings import get_settings
+
+# Rough size of a token for gemini, good enough to enforce a budget
+CHARS_PER_TOKEN = 4
+# Characters of a tool response kept once it is compacted
+PREVIEW_CHARS = 200
+
+
+# A turn starts at every user message carrying text, tool responses that also
+# have the user role belong to the turn that triggered them
+def split_turns(contents: List) -> List[List]:
+    turns = []
+    for content in contents:
+        starts_turn = content.role == "user" and any(
+            part.text for part in content.parts or []
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def estimate_tokens(contents: List):
+    size = sum(len(content.model_dump_json(exclude_none=True)) for content in contents)
+    return size // CHARS_PER_TOKEN
+
+
+# Replace the tool responses of a content with a short preview
+def compact_content(content):
+    from google.genai import types
+
+    if not any(part.function_response for part in content.parts or []):
+        return content
+
+    parts = []
+    for part in content.parts:
+        function_response = part.function_response
+        if function_response is None:
+            parts.append(part)
+            continue
+        preview = json.dumps(function_response.response, default=str)
+        parts.append(
+            types.Part(
+                function_response=types.FunctionResponse(
+                    id=function_response.id,
+                    name=function_response.name,
+                    response={
+                        "compacted": True,
+                        "preview": preview[:PREVIEW_CHARS],
+                    },
+                )
+            )
+        )
+    return types.Content(role=content.role, parts=parts)
+
+
+# Characters of the summary block that replaces the turns before keep_turns,
+# the most recent summarized turns are kept when it is full
+SUMMARY_CHARS = 2000
+# Characters kept of each summarized turn
+SUMMARY_LINE_CHARS = 200
+
+
+# One line per turn: the user message, the tools it called and the answer
+def summarize_turn(turn: List):
+    question, answer, tools = "", "", []
+    for content in turn:
+        for part in content.parts or []:
+            if part.function_call:
+                tools.append(part.function_call.name)
+            elif part.text and content.role == "user" and not question:
+                question = part.text
+            elif part.text and content.role == "model":
+                answer = part.text
+
+    line = f"- user: {' '.join(question.split())}"
+    if tools:
+        line += f" | tools: {', '.join(tools)}"
+    if answer:
+        line += f" | answer: {' '.join(answer.split())}"
+    return line[:SUMMARY_LINE_CHARS]
+
+
+def summary_content(turns: List[List]):
+    from google.genai import types
+
+    lines = []
+    size = 0
+    for turn in reversed(turns):
+        line = summarize_turn(turn)
+        if size + len(line) > SUMMARY_CHARS:
+            break
+        lines.append(line)
+        size += len(line) + 1
+
+    header = f"Summary of the {len(turns)} earlier turns of this session"
+    if len(lines) < len(turns):
+        header += f", the {len(turns) - len(lines)} oldest are left out"
+    text = "\n".join([f"{header}:", *reversed(lines)])
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+# The last keep_turns turns are sent verbatim, newest first while they fit in
+# the token budget (a recent turn that does not fit gets its tool responses
+# compacted, then is dropped). Every older or dropped turn is merged into one
+# summary block of bounded size, so the prompt stops growing after keep_turns.
+# The current turn is always kept whole.
+def compact_contents(contents: List, keep_turns: int, token_budget: int) -> List:
+    turns = split_turns(contents)
+    recent = turns[-max(keep_turns, 1) :]
+    summarized = turns[: len(turns) - len(recent)]
+
+    kept_turns = []
+    used_tokens = 0
+    for age, turn in enumerate(reversed(recent)):
+        tokens = estimate_tokens(turn)
+        if age > 0 and used_tokens + tokens > token_budget:
+            turn = [compact_content(content) for content in turn]
+            tokens = estimate_tokens(turn)
+            if used_tokens + tokens > token_budget:
+                summarized = turns[: len(turns) - age]
+                break
+        kept_turns.append(turn)
+        used_tokens += tokens
+
+    if summarized:
+        summary = summary_content(summarized)
+        if used_tokens + estimate_tokens([summary]) <= token_budget:
+            kept_turns.append([summary])
+
+    return [content for turn in reversed(kept_turns) for content in turn]
+
+
+# before_model_callback of the orchestrator, bounds the prompt of long sessions
+# without touching the events stored in the session
+def compact_session_history(callback_context, llm_request):
+    llm_request.contents = compact_contents(
+        contents=llm_request.contents,
+        keep_turns=get_settings().ORCHESTRATOR_KEEP_TURNS,
+        token_budget=get_settings().ORCHESTRATOR_TOKEN_BUDGET,
+    )
+    return None
@@ -0,0 +1,31 @@
+import asyncio
+from functools import lru_cache
+from typing import List
+
+from app.config.settings import get_settings
+from app.service.cassette_service import cassette
+
+
+# Ollama client, built on first use so importing the app stays cheap
+@lru_cache
+def get_ollama_client():
+    from ollama import AsyncClient
+
+    return AsyncClient()
+
+
+# Embed a search query, same call as the MCP server so vectors match
+@cassette("embed_text")
+async def embed_text(query: str):
+    res = await get_ollama_client().embeddings(
+        model=get_settings().EMBEDDING_MODEL,
+        prompt=query,
+        keep_alive=get_settings().EMBEDDING_KEEP_ALIVE,
+    )
+    return res.embedding
+
+
+# Embed many texts, on the same endpoint as queries since /api/embed and
+# /api/embeddings do not return identical vectors
+async def embed_texts(texts: List[str]):
+    return await asyncio.gather(*(embed_text(query=text) for text in texts))
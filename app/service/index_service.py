@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List
+
+from app.config.settings import get_settings
+from app.service.embedding_service import embed_texts
+from app.service.opensearch_service import opensearch_client
+
+logger = logging.getLogger(__name__)
+
+
+# Text that is embedded and matched by BM25 for each kind of document, must
+# stay in line with how the documents are ingested
+def agent_search_text(raw: Dict):
+    return " ".join(
+        [raw["agent_name"], raw["agent_description"], raw["agent_instruction"]]
+    )
+
+
+def tool_search_text(raw: Dict):
+    return " ".join([raw["name"], raw.get("description", "")])
+
+
+SEARCH_TEXT = {"agents": agent_search_text, "tools": tool_search_text}
+# Fields the search text is built from, a definition without them is refused
+REQUIRED_FIELDS = {
+    "agents": ["agent_name", "agent_description", "agent_instruction"],
+    "tools": ["name"],
+}
+
+
+def missing_fields(index: str, raw: Dict):
+    return [
+        field for field in REQUIRED_FIELDS[index] if not isinstance(raw.get(field), str)
+    ]
+
+
+# The embedding model is part of the hash so a model swap marks every
+# document as stale
+def content_hash(search_text: str):
+    text = f"{get_settings().EMBEDDING_MODEL}\n{search_text}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Documents indexed before hashes were stored have none, nothing tells which
+# model embedded them so they count as stale and get hashed on re-embedding
+def stored_content_hash(source: Dict):
+    return source.get("content_hash")
+
+
+# Top level fields of a document derived from raw, kept in sync on update
+def derived_fields(index: str, raw: Dict):
+    if index == "agents":
+        return {"agent_name": raw["agent_name"], "tools": raw.get("tools", [])}
+    return {"name": raw["name"]}
+
+
+# Agents are indexed under their name, tools get the same treatment
+def tool_doc_id(name: str):
+    return name
+
+
+def split_names(names: List[str]):
+    return [name for value in names for name in value.split(",") if name]
+
+
+# Raw definitions of many documents with a single _mget, missing ones skipped
+async def get_raw_documents(index: str, doc_ids: List[str]):
+    async with opensearch_client() as client:
+        if not doc_ids or not await client.indices.exists(index=index):
+            return []
+        res = await client.mget(
+            index=index, body={"ids": doc_ids}, _source_includes=["raw"]
+        )
+        return [doc["_source"]["raw"] for doc in res["docs"] if doc.get("found")]
+
+
+# Full document for a raw definition, as the ingestion pipelines build it
+async def build_document(index: str, raw: Dict):
+    search_text = SEARCH_TEXT[index](raw)
+    [embedding] = await embed_texts([search_text])
+    return {
+        "raw": raw,
+        **derived_fields(index, raw),
+        "search_text": search_text,
+        "content_hash": content_hash(search_text),
+        "embedding": embedding,
+    }
+
+
+# Partial update of raw, search_text and the embedding are only recomputed
+# when the searchable text actually changed
+async def build_update(index: str, raw: Dict, source: Dict):
+    search_text = SEARCH_TEXT[index](raw)
+    new_hash = content_hash(search_text)
+    doc = {"raw": raw, **derived_fields(index, raw)}
+    if new_hash != stored_content_hash(source):
+        [embedding] = await embed_texts([search_text])
+        doc.update(search_text=search_text, content_hash=new_hash, embedding=embedding)
+    return doc
+
+
+# Status of the background re-embedding jobs, keyed by index
+reembed_jobs = {}
+# The event loop only keeps weak references to tasks, a running job is held
+# here until it finishes so it can not be garbage collected mid-run
+_background_jobs = set()
+
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    _background_jobs.add(task)
+    task.add_done_callback(_background_jobs.discard)
+    return task
+
+
+# Re-embeds every stale document of an index (or all of them with force) in
+# batches, written back with _bulk partial updates
+async def reembed_index(index: str, job: Dict, force: bool = False):
+    from opensearchpy.helpers import async_bulk, async_scan
+
+    batch_size = get_settings().REEMBED_BATCH_SIZE
+
+    async def flush(batch):
+        texts = [search_text for _, search_text, _ in batch]
+        embeddings = await embed_texts(texts)
+        actions = [
+            {
+                "_op_type": "update",
+                "_index": index,
+                "_id": doc_id,
+                "doc": {
+                    "search_text": search_text,
+                    "content_hash": new_hash,
+                    "embedding": embedding,
+                },
+            }
+            for (doc_id, search_text, new_hash), embedding in zip(batch, embeddings)
+        ]
+        await async_bulk(client, actions, refresh=False)
+        job["updated"] += len(actions)
+
+    try:
+        async with opensearch_client() as client:
+            batch = []
+            async for hit in async_scan(
+                client,
+                index=index,
+                query={"query": {"match_all": {}}},
+                _source_includes=["raw", "search_text", "content_hash"],
+                size=batch_size,
+            ):
+                job["scanned"] += 1
+                source = hit["_source"]
+                search_text = SEARCH_TEXT[index](source["raw"])
+                new_hash = content_hash(search_text)
+                if force or new_hash != stored_content_hash(source):
+                    batch.append((hit["_id"], search_text, new_hash))
+                if len(batch) >= batch_size:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+            await client.indices.refresh(index=index)
+        job["status"] = "done"
+    except Exception as exc:
+        logger.exception("Re-embedding %s failed", index)
+        job.update(status="failed", error=repr(exc))
+
+
+# Registers the job before scheduling it so concurrent starts are refused
+def start_reembed(index: str, force: bool = False):
+    if reembed_jobs.get(index, {}).get("status") == "running":
+        return False
+    job = {"status": "running", "scanned": 0, "updated": 0}
+    reembed_jobs[index] = job
+    run_in_background(reembed_index(index=index, job=job, force=force))
+    return True
+
+
+# Status of the legacy tool migration
+tool_migration = {}
+
+
+# Tools indexed before they were addressed by name have a generated id. One
+# pass moves each of them under tool_doc_id (a document already stored there
+# wins) and deletes the legacy copies, with a single _bulk.
+async def migrate_legacy_tools(job: Dict):
+    from opensearchpy.helpers import async_bulk, async_scan
+
+    try:
+        async with opensearch_client() as client:
+            current_ids = set()
+            legacy = {}
+            if await client.indices.exists(index="tools"):
+                async for hit in async_scan(
+                    client,
+                    index="tools",
+                    query={"query": {"match_all": {}}},
+                    size=get_settings().REEMBED_BATCH_SIZE,
+                ):
+                    job["scanned"] += 1
+                    name = hit["_source"].get("raw", {}).get("name")
+                    if not name:
+                        continue
+                    doc_id = tool_doc_id(name)
+                    if hit["_id"] == doc_id:
+                        current_ids.add(doc_id)
+                    else:
+                        legacy.setdefault(doc_id, []).append(hit)
+
+            actions = []
+            for doc_id, hits in legacy.items():
+                if doc_id not in current_ids:
+                    actions.append(
+                        {
+                            "_op_type": "index",
+                            "_index": "tools",
+                            "_id": doc_id,
+                            "_source": hits[0]["_source"],
+                        }
+                    )
+                actions.extend(
+                    {"_op_type": "delete", "_index": "tools", "_id": hit["_id"]}
+                    for hit in hits
+                )
+            if actions:
+                await async_bulk(client, actions, refresh=True)
+            job["migrated"] = len(legacy)
+        job["status"] = "done"
+    except Exception as exc:
+        logger.exception("Migrating legacy tools failed")
+        job.update(status="failed", error=repr(exc))
+
+
+def start_tool_migration():
+    if tool_migration.get("status") == "running":
+        return False
+    tool_migration.clear()
+    tool_migration.update(status="running", scanned=0, migrated=0)
+    run_in_background(migrate_legacy_tools(job=tool_migration))
+    return True
@@ -0,0 +1,22 @@
+from app.config.settings import get_settings
+
+
+# OpenSearch client, the sdk is imported on first use to keep startup fast
+def opensearch_client():
+    from opensearchpy import AsyncOpenSearch
+
+    return AsyncOpenSearch(
+        hosts=[
+            {
+                "host": get_settings().OPENSEARCH_HOST,
+                "port": get_settings().OPENSEARCH_PORT,
+            }
+        ],
+        http_auth=(
+            get_settings().OPENSEARCH_USERNAME,
+            get_settings().OPENSEARCH_PASSWORD,
+        ),
+        use_ssl=True,
+        verify_certs=False,
+        ssl_show_warn=False,
+    )
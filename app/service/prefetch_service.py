@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.config.settings import get_settings
+from app.service.embedding_service import embed_text
+from app.service.search_service import search_agents, search_tools
+
+logger = logging.getLogger(__name__)
+
+# Discovery prefetch of the current /invoke_agent request, if any
+_prefetch: ContextVar[Optional["DiscoveryPrefetch"]] = ContextVar(
+    "discovery_prefetch", default=None
+)
+# Orchestrator tools answered from the prefetch, with the args they search on
+PREFETCHED_TOOLS = {
+    "search_agent": ("agent_name", "agent_description"),
+    "tool_search": ("tool_name", "tool_description"),
+}
+
+stats = Counter()
+
+
+def query_tokens(text: str):
+    return {token for token in re.findall(r"\w+", text.casefold()) if len(token) > 2}
+
+
+def similarity(left: set, right: set):
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+# Agent and tool search on the raw user query, started together with the
+# orchestrator run so embedding + OpenSearch latency hides behind the first
+# model turn. Both searches share one embedding of the query.
+class DiscoveryPrefetch:
+    def __init__(self, query: str):
+        self.query = query
+        self.tokens = query_tokens(query)
+        self.tasks = {}
+        self.used = set()
+
+    def start(self):
+        vector = asyncio.ensure_future(embed_text(query=self.query))
+        self.tasks = {
+            "vector": vector,
+            "search_agent": asyncio.ensure_future(self._search(search_agents, vector)),
+            "tool_search": asyncio.ensure_future(self._search(search_tools, vector)),
+        }
+
+    async def _search(self, search, vector):
+        return await search(text=self.query, query_vector=await vector)
+
+    # Prefetched result for a tool call whose query is close enough to the
+    # user query, None to let the real tool run
+    async def answer(self, tool_name: str, args: Dict):
+        task = self.tasks.get(tool_name)
+        if task is None:
+            return None
+
+        text = " ".join(
+            str(args.get(field, "")) for field in PREFETCHED_TOOLS[tool_name]
+        )
+        min_similarity = get_settings().PREFETCH_MIN_SIMILARITY
+        if similarity(query_tokens(text), self.tokens) < min_similarity:
+            stats["misses"] += 1
+            return None
+
+        try:
+            result = await task
+        except Exception as exc:
+            logger.warning("Discovery prefetch of %s failed: %r", tool_name, exc)
+            stats["misses"] += 1
+            return None
+
+        stats["hits"] += 1
+        self.used.add(tool_name)
+        return {"result": result}
+
+    def close(self):
+        for name, task in self.tasks.items():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Retrieve the error so a failed prefetch is not reported twice
+                task.exception()
+            if name in PREFETCHED_TOOLS and name not in self.used:
+                stats["unused"] += 1
+
+
+# Starts the prefetch for the duration of a request
+@asynccontextmanager
+async def discovery_prefetch(query: str):
+    # On replay the embedding and searches are served from their cassettes, so
+    # the prefetch answers the same tool calls as when the trace was recorded
+    if not get_settings().PREFETCH_ENABLED:
+        yield
+        return
+
+    prefetch = DiscoveryPrefetch(query=query)
+    prefetch.start()
+    token = _prefetch.set(prefetch)
+    try:
+        yield
+    finally:
+        _prefetch.reset(token)
+        prefetch.close()
+
+
+# before_tool_callback of the orchestrator, a returned dict replaces the call
+async def answer_from_prefetch(tool, args, tool_context):
+    prefetch = _prefetch.get()
+    if prefetch is None:
+        return None
+    return await prefetch.answer(tool_name=tool.name, args=args)
+
+
+def snapshot():
+    answered = stats["hits"] + stats["misses"]
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "unused": stats["unused"],
+        "hit_rate": stats["hits"] / answered if answered else 0.0,
+    }
@@ -0,0 +1,57 @@
+from typing import List
+
+from app.service.cassette_service import cassette
+from app.service.opensearch_service import opensearch_client
+
+
+# Same hybrid queries as the search_agent / tool_search MCP tools, the vector
+# is derived from the text so only the text identifies a recorded search
+@cassette("search_agents", key=lambda text, query_vector: [text])
+async def search_agents(text: str, query_vector: List[float]):
+    body = {
+        "size": 3,
+        "query": {
+            "hybrid": {
+                "queries": [
+                    {
+                        "multi_match": {
+                            "query": text,
+                            "fields": ["agent_name^3", "search_text"],
+                        }
+                    },
+                    {"knn": {"embedding": {"vector": query_vector, "k": 3}}},
+                ]
+            }
+        },
+    }
+    async with opensearch_client() as client:
+        res = await client.search(
+            index="agents", body=body, params={"search_pipeline": "agent_team_rrf"}
+        )
+    return [hit["_source"]["raw"] for hit in res["hits"]["hits"]]
+
+
+@cassette("search_tools", key=lambda text, query_vector: [text])
+async def search_tools(text: str, query_vector: List[float]):
+    body = {
+        "size": 3,
+        "query": {
+            "hybrid": {
+                "queries": [
+                    {
+                        "multi_match": {
+                            "query": text,
+                            "fields": ["name^3", "search_text"],
+                            "type": "best_fields",
+                        }
+                    },
+                    {"knn": {"embedding": {"vector": query_vector, "k": 3}}},
+                ]
+            }
+        },
+    }
+    async with opensearch_client() as client:
+        res = await client.search(
+            index="tools", body=body, params={"search_pipeline": "agent_team_rrf"}
+        )
+    return [hit["_source"]["raw"] for hit in res["hits"]["hits"]]
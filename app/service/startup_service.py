@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from app.config.settings import get_settings
+from app.service.agent_service import get_root_agent, get_session_service
+
+logger = logging.getLogger(__name__)
+
+_ready = asyncio.Event()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+# Opens the orchestrator's MCP session ahead of the first request, listing the
+# tools keeps a live session in the toolset's session manager
+async def warm_up():
+    # Replays run offline, there is nothing to warm up
+    if get_settings().CASSETTE_MODE == "replay":
+        return
+
+    for toolset in get_root_agent().tools:
+        try:
+            await toolset.get_tools()
+        except Exception as exc:
+            logger.warning("Warm-up of the MCP session failed: %r", exc)
+
+
+# Builds the heavy objects off the event loop so liveness probes keep answering,
+# a failing build is logged and retried instead of leaving /readyz at 503
+async def prepare_runtime():
+    while True:
+        try:
+            await asyncio.to_thread(get_session_service)
+            await asyncio.to_thread(get_root_agent)
+            break
+        except Exception as exc:
+            logger.warning("Building the orchestrator failed: %r", exc)
+            await asyncio.sleep(get_settings().STARTUP_RETRY_SECONDS)
+    await warm_up()
+    _ready.set()
+
+
+# Ready after the first warm-up, then re-warm periodically so a dropped MCP
+# session is reopened before a request needs it
+async def keep_warm():
+    await prepare_runtime()
+    while True:
+        await asyncio.sleep(get_settings().WARMUP_INTERVAL_SECONDS)
+        await warm_up()
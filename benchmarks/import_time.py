@@ -0,0 +1,96 @@
+"""Import time report for the service entrypoints.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for
+each entrypoint, prints the slowest imports and fails when an entrypoint goes
+over the budget tracked in ``import_time_budget.json``. Every entrypoint is
+imported ``--runs`` times and the run with the median total is kept, single
+runs vary by a few hundred ms.
+
+    python -m benchmarks.import_time            # report and check budgets
+    python -m benchmarks.import_time --update   # record the current timings
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ENTRYPOINTS = ["app.main", "mcp_server.main"]
+BUDGET_FILE = Path(__file__).with_name("import_time_budget.json")
+# Headroom added on top of the measured time when the budget is updated
+BUDGET_HEADROOM = 1.25
+
+
+def measure(module: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        self_us, cumulative_us, name = fields[0], fields[1], fields[2]
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_median(module: str, runs: int):
+    samples = [measure(module) for _ in range(runs)]
+    samples.sort(key=lambda timings: timings[module][1])
+    return samples[len(samples) // 2]
+
+
+def report(module: str, timings: dict, top: int):
+    total_ms = timings[module][1] / 1000
+    print(f"\n{module}: {total_ms:.1f} ms")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (_, cumulative_us) in slowest[1 : top + 1]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    return total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--update", action="store_true", help="rewrite the budget")
+    parser.add_argument("--top", type=int, default=15, help="imports to list")
+    parser.add_argument("--runs", type=int, default=5, help="imports per module")
+    args = parser.parse_args()
+
+    budgets = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    measured = {}
+    for module in ENTRYPOINTS:
+        measured[module] = report(module, measure_median(module, args.runs), args.top)
+
+    if args.update:
+        budgets = {
+            module: round(total_ms * BUDGET_HEADROOM)
+            for module, total_ms in measured.items()
+        }
+        BUDGET_FILE.write_text(json.dumps(budgets, indent=2) + "\n")
+        print(f"\nBudget written to {BUDGET_FILE}")
+        return 0
+
+    over_budget = [
+        module
+        for module, total_ms in measured.items()
+        if module in budgets and total_ms > budgets[module]
+    ]
+    for module in over_budget:
+        print(
+            f"\n{module} is over budget: "
+            f"{measured[module]:.1f} ms > {budgets[module]} ms"
+        )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Per turn orchestrator latency over a long session, with and without compaction.
+
+Builds a synthetic ``/invoke_agent`` history where every turn searches agents
+(a large JSON response), calls one and answers. For each turn the prompt is
+compacted (timed) and sent to a stub model whose latency grows with the
+prompt: ``--base-ms`` plus ``--ms-per-1k-tokens`` for every 1000 prompt
+tokens, roughly how prefill time scales. The stub sleeps, so the reported
+latency is measured, not computed.
+
+Without compaction the prompt and the latency grow linearly with the session,
+with it both stay flat once the history is past ``--keep-turns``.
+
+    python -m benchmarks.session_compaction --turns 100
+"""
+
+import argparse
+import json
+import time
+
+from google.genai import types
+
+from app.service.compaction_service import compact_contents, estimate_tokens
+
+
+def search_results(turn: int):
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": json.dumps(
+                    [
+                        {
+                            "agent_name": f"agent_{turn}_{rank}",
+                            "agent_description": "Summarizes invoices " * 10,
+                            "agent_instruction": "Extract and total every line " * 40,
+                            "tools": ["invoice_extraction"],
+                        }
+                        for rank in range(3)
+                    ]
+                ),
+            }
+        ]
+    }
+
+
+def build_turn(turn: int):
+    return [
+        types.Content(
+            role="user", parts=[types.Part(text=f"Summarize invoice batch {turn}")]
+        ),
+        types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        id=f"search-{turn}",
+                        name="search_agent",
+                        args={"agent_name": "invoice", "agent_description": "sum"},
+                    )
+                )
+            ],
+        ),
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        id=f"search-{turn}",
+                        name="search_agent",
+                        response=search_results(turn),
+                    )
+                )
+            ],
+        ),
+        types.Content(
+            role="model", parts=[types.Part(text=f"agent_{turn}_0 started running..")]
+        ),
+    ]
+
+
+class StubModel:
+    def __init__(self, base_ms: float, ms_per_1k_tokens: float):
+        self.base_ms = base_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+
+    def generate(self, contents: list):
+        tokens = estimate_tokens(contents)
+        time.sleep((self.base_ms + self.ms_per_1k_tokens * tokens / 1000) / 1000)
+        return tokens
+
+
+# Wall time of one model turn: compaction (if any) plus the stub model call
+def timed_turn(model: StubModel, history: list, compact, **compaction):
+    start = time.perf_counter()
+    sent = compact_contents(contents=history, **compaction) if compact else history
+    tokens = model.generate(sent)
+    return tokens, (time.perf_counter() - start) * 1000
+
+
+def main(turns: int, keep_turns: int, token_budget: int, model: StubModel):
+    history = []
+    compaction = {"keep_turns": keep_turns, "token_budget": token_budget}
+    print(
+        f"{'turn':>5} {'raw tokens':>11} {'raw latency':>12} "
+        f"{'sent tokens':>12} {'latency':>10}"
+    )
+    for turn in range(1, turns + 1):
+        history.extend(build_turn(turn))
+        if turn not in (1, 5, 10, 25, 50, 75, turns):
+            continue
+        raw_tokens, raw_ms = timed_turn(model, history, compact=False)
+        sent_tokens, sent_ms = timed_turn(model, history, compact=True, **compaction)
+        print(
+            f"{turn:>5} {raw_tokens:>11} {raw_ms:>9.1f} ms "
+            f"{sent_tokens:>12} {sent_ms:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--token-budget", type=int, default=16000)
+    parser.add_argument("--base-ms", type=float, default=200)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20)
+    args = parser.parse_args()
+    main(
+        turns=args.turns,
+        keep_turns=args.keep_turns,
+        token_budget=args.token_budget,
+        model=StubModel(base_ms=args.base_ms, ms_per_1k_tokens=args.ms_per_1k_tokens),
+    )
@@ -0,0 +1,115 @@
+"""Per tool call latency, loopback http vs in process dispatch.
+
+Registers a no-op ``bench_echo`` tool on ``agent_server``, serves it over
+streamable http on a local port and times the same call through both paths:
+
+- loopback: a FastMCP client session against ``http://127.0.0.1:<port>/mcp``
+  (what ``McpToolset`` does when the tool lives in this process)
+- in process: the ``LocalToolset`` adapter used by remote agents
+
+Before timing, a ``bench_runs`` tool taking ``List[AgentRun]`` is called through
+both paths to check the adapter validates model typed arguments and answers
+with the same result as the MCP server.
+
+    python -m benchmarks.tool_dispatch --calls 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from fastmcp import Client
+
+from mcp_server.main import agent_server
+from mcp_server.schema.agent_run import AgentRun
+from mcp_server.service.local_toolset import LocalToolset
+
+
+@agent_server.tool(name="bench_echo", description="Returns its input")
+async def bench_echo(text: str):
+    return text
+
+
+@agent_server.tool(name="bench_runs", description="Returns the agent names")
+async def bench_runs(runs: List[AgentRun]):
+    return [run.agent_name for run in runs]
+
+
+def summarize(label: str, samples: list):
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    p50 = statistics.median(samples_ms)
+    p99 = samples_ms[int(len(samples_ms) * 0.99) - 1]
+    print(f"{label:<12} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+async def check_parity(url: str):
+    runs = [
+        {
+            "agent_name": f"agent_{index}",
+            "agent_description": "Summarizes invoices",
+            "agent_instruction": "Total every line",
+            "required_tools": ["invoice_extraction"],
+            "input_query": f"invoice {index}",
+        }
+        for index in range(3)
+    ]
+    async with Client(url) as client:
+        remote = await client.call_tool_mcp("bench_runs", {"runs": runs})
+    toolset = LocalToolset(server=agent_server, tool_filter=["bench_runs"])
+    [tool] = await toolset.get_tools()
+    local = await tool.run_async(args={"runs": runs}, tool_context=None)
+    expected = remote.model_dump(exclude_none=True, mode="json")
+    assert not local.get("isError"), local
+    assert local == expected, (local, expected)
+
+
+async def time_loopback(url: str, calls: int):
+    samples = []
+    async with Client(url) as client:
+        await client.call_tool("bench_echo", {"text": "warmup"})
+        for _ in range(calls):
+            start = time.perf_counter()
+            await client.call_tool("bench_echo", {"text": "ping"})
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_in_process(calls: int):
+    toolset = LocalToolset(server=agent_server, tool_filter=["bench_echo"])
+    [tool] = await toolset.get_tools()
+    await tool.run_async(args={"text": "warmup"}, tool_context=None)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await tool.run_async(args={"text": "ping"}, tool_context=None)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(calls: int, port: int):
+    server_task = asyncio.create_task(
+        agent_server.run_http_async(host="127.0.0.1", port=port, show_banner=False)
+    )
+    # Give uvicorn a moment to bind
+    await asyncio.sleep(1)
+    try:
+        await check_parity(f"http://127.0.0.1:{port}/mcp")
+        loopback = await time_loopback(f"http://127.0.0.1:{port}/mcp", calls)
+        in_process = await time_in_process(calls)
+    finally:
+        server_task.cancel()
+
+    summarize("loopback", loopback)
+    summarize("in process", in_process)
+    speedup = statistics.median(loopback) / statistics.median(in_process)
+    print(f"median speedup {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8095)
+    args = parser.parse_args()
+    asyncio.run(main(calls=args.calls, port=args.port))
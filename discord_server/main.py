@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 import os
 
@@ -23,6 +24,9 @@ OPENSEARCH_PASSWORD = os.environ.get("OPENSEARCH_PASSWORD")
 DISCORD_CHANNEL_ID = int(os.environ.get("DISCORD_CHANNEL_ID"))
 
 ollama_client = AsyncClient()
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "qwen3-embedding:0.6b")
+# Same keep alive as the app and MCP server so ollama keeps the model pinned
+EMBEDDING_KEEP_ALIVE = int(os.environ.get("EMBEDDING_KEEP_ALIVE", -1))
 
 handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
 intents = discord.Intents.default()
@@ -34,7 +38,9 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 
 # Embed text
 async def embed_text(query: str):
-    res = await ollama_client.embeddings(model="qwen3-embedding:0.6b", prompt=query)
+    res = await ollama_client.embeddings(
+        model=EMBEDDING_MODEL, prompt=query, keep_alive=EMBEDDING_KEEP_ALIVE
+    )
     return res.embedding
 
 
@@ -52,6 +58,10 @@ async def store_agent_data_to_opensearch(data: Dict):
         "search_text": text,
         "tools": data["tools"],
         "embedding": vector,
+        # Lets updates skip re-embedding when the text did not change
+        "content_hash": hashlib.sha256(
+            f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")
+        ).hexdigest(),
     }
     async with AsyncOpenSearch(
         hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
@@ -75,6 +85,7 @@ class ApproveRejectView(discord.ui.View):
         agent_description: str,
         agent_instruction: str,
         tools: List[str],
+        cacheable: bool = False,
         timeout=180,
     ):
         super().__init__(timeout=timeout)
@@ -82,6 +93,7 @@ class ApproveRejectView(discord.ui.View):
         self.agent_description = agent_description
         self.agent_instruction = agent_instruction
         self.tools = tools
+        self.cacheable = cacheable
 
     @discord.ui.button(label="Approve", style=discord.ButtonStyle.green)
     async def approve(
@@ -95,6 +107,7 @@ class ApproveRejectView(discord.ui.View):
             "agent_description": self.agent_description,
             "agent_instruction": self.agent_instruction,
             "tools": self.tools,
+            "cacheable": self.cacheable,
         }
         # Store the agent data into opensearch
         await store_agent_data_to_opensearch(data=data)
@@ -138,6 +151,7 @@ async def handle_request(request):
         agent_description = data["agent_description"]
         agent_instruction = data["agent_instruction"]
         tools = data["tools"]
+        cacheable = data.get("cacheable", False)
 
     except KeyError:
         return web.json_response({"error": "invalid payload"}, status=400)
@@ -151,12 +165,14 @@ async def handle_request(request):
     embed.add_field(name="Agent Description", value=agent_description, inline=False)
     embed.add_field(name="Agent Instruction", value=agent_instruction, inline=False)
     embed.add_field(name="Tools", value=",".join(tools), inline=False)
+    embed.add_field(name="Cacheable", value=str(cacheable), inline=False)
 
     view = ApproveRejectView(
         agent_name=agent_name,
         agent_description=agent_description,
         agent_instruction=agent_instruction,
         tools=tools,
+        cacheable=cacheable,
     )
 
     # Send message asynchronously
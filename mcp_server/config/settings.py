@@ -13,6 +13,34 @@ class Settings(BaseSettings):
     OPENSEARCH_USERNAME: str
     OPENSEARCH_PASSWORD: str
     DISCORD_CHANNEL_ID: str
+    # Agent runs in flight for a single call_agents fan out: the default, and
+    # the cap on what the model asks for
+    CALL_AGENTS_CONCURRENCY: int = 8
+    CALL_AGENTS_MAX_CONCURRENCY: int = 32
+    # Result cache for agents that declare themselves cacheable
+    AGENT_CACHE_BACKEND: str = "memory"  # memory | redis
+    AGENT_CACHE_TTL_SECONDS: int = 3600
+    AGENT_CACHE_MAX_ENTRIES: int = 1024
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    EMBEDDING_MODEL: str = "qwen3-embedding:0.6b"
+    # Keep the embedding model loaded in ollama (seconds), negative means
+    # forever. Every client of the model must send the same value, ollama
+    # applies its 5 minute default to requests without one.
+    EMBEDDING_KEEP_ALIVE: int = -1
+    # Interval of the periodic warm-up after startup, capped at half the
+    # keep alive so the model is re-pinned before ollama unloads it
+    WARMUP_INTERVAL_SECONDS: float = 120
+    # Deadline of a remote agent run
+    REMOTE_AGENT_DEADLINE_SECONDS: float = 300
+    # Hedged requests for idempotent calls (embedding, search, ocr)
+    HEDGING_ENABLED: bool = False
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_MAX_RATIO: float = 0.1
+    # Record / replay of outbound calls, see service/cassette_service.py
+    CASSETTE_MODE: str = "off"  # off | record | replay
+    CASSETTE_DIR: str = "cassettes"
+    CASSETTE_REPLAY_TIMING: str = "zero"  # original | zero
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,22 +1,58 @@
 import asyncio
-from typing import List
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Optional
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
+from mcp_server.config.settings import get_settings
+from mcp_server.schema.agent_run import AgentRun
 from mcp_server.service.agent_service import (
     invoke_remote_agent,
+    invoke_remote_agents,
     search_relevant_agents,
 )
 from mcp_server.service.discord_service import send_message
 from mcp_server.service.invoice_service import extract_invoice_details
+from mcp_server.service.startup_service import is_ready, keep_warm
+from mcp_server.service.tool_registry import register_local_server
 from mcp_server.service.tool_service import search_relevent_tools
 
+
+# Heavy sdks are imported and dependencies warmed up in the background,
+# readiness flips after the first warm-up
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    startup_task = asyncio.create_task(keep_warm())
+    yield
+    startup_task.cancel()
+
+
 # Agent Server
 agent_server = FastMCP(
     name="Agent Manager",
     instructions="""This server has capablities to manage agents""",
+    lifespan=lifespan,
 )
+# Remote agents dispatch the tools of this server in process
+register_local_server(agent_server)
+
+
+# Liveness probe
+@agent_server.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request):
+    return JSONResponse({"status": "ok"})
+
+
+# Readiness probe, only ready once the sdks are loaded and warm-up finished
+@agent_server.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request):
+    if not is_ready():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return JSONResponse({"status": "ready"})
 
 
 # Search relevant agents
@@ -35,17 +71,23 @@ async def search_agent(agent_name: str, agent_description: str):
 # Tool which is used to create a agent with human approval
 @agent_server.tool(
     name="create_agent",
-    description="This tool is used to create a new agent",
+    description="""This tool is used to create a new agent.
+    Set cacheable only when the agent's tools have no side effects""",
     tags=["agent"],
 )
 async def create_agent(
-    agent_name: str, agent_description: str, agent_insturctions: str, tools: List[str]
+    agent_name: str,
+    agent_description: str,
+    agent_insturctions: str,
+    tools: List[str],
+    cacheable: bool = False,
 ):
     response = await send_message(
         agent_name=agent_name,
         agent_description=agent_description,
         agent_instruction=agent_insturctions,
         tools=tools,
+        cacheable=cacheable,
     )
     return response
 
@@ -86,6 +128,30 @@ async def call_agent(
     return {"Message": f"{agent_name} started running.."}
 
 
+# Fan out many agent runs at once, results are delivered together
+@agent_server.tool(
+    name="call_agents",
+    description="""This tool is used to invoke agents over many inputs in parallel.
+    Pass one run per (agent definition, input_query) pair, the results of all
+    runs are delivered together""",
+)
+async def call_agents(
+    runs: List[AgentRun],
+    max_concurrency: Annotated[Optional[int], Field(ge=1)] = None,
+):
+    payloads = [run.model_dump() for run in runs]
+    # The model picks the concurrency, it is capped by the server
+    settings = get_settings()
+    concurrency = min(
+        max_concurrency or settings.CALL_AGENTS_CONCURRENCY,
+        settings.CALL_AGENTS_MAX_CONCURRENCY,
+    )
+    asyncio.create_task(
+        invoke_remote_agents(payloads=payloads, max_concurrency=concurrency)
+    )
+    return {"Message": f"{len(runs)} agent runs started.."}
+
+
 # Invoice Extraction
 @agent_server.tool(
     name="invoice_extraction",
@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class AgentRun(BaseModel):
+    agent_name: str
+    agent_description: str
+    agent_instruction: str
+    required_tools: List[str]
+    input_query: str
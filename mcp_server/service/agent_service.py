@@ -1,26 +1,30 @@
+import asyncio
+import logging
 import os
 import uuid
-from typing import Dict
-
-from google.adk.agents.llm_agent import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.mcp_tool import McpToolset, StreamableHTTPConnectionParams
-from google.genai import types
-from ollama import AsyncClient
-from opensearchpy import AsyncOpenSearch
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Dict, List
 
 from mcp_server.config.settings import get_settings
 from mcp_server.schema.agent_message import AgentMessage
-from mcp_server.service.discord_service import send_agent_message
-
-ollama_client = AsyncClient()
+from mcp_server.service.cache_service import agent_cache_key, get_agent_cache
+from mcp_server.service.cassette_service import (
+    cassette_toolset,
+    record_model_call,
+    replay_model_call,
+)
+from mcp_server.service.discord_service import send_agent_message, send_agent_messages
+from mcp_server.service.embedding_service import embed_text
+from mcp_server.service.opensearch_service import get_documents, search_index
+from mcp_server.service.tool_registry import get_local_server, get_local_tool_names
+from shared.service.deadline_service import apply_deadline, deadline
 
+# The adk / genai sdks are heavy, they are only imported when an agent runs
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.sessions import InMemorySessionService
 
-# Text Embedding function
-async def embed_text(query: str):
-    res = await ollama_client.embeddings(model="qwen3-embedding:0.6b", prompt=query)
-    return res.embedding
+logger = logging.getLogger(__name__)
 
 
 # Search agents based on name and description
@@ -29,51 +33,41 @@ async def search_relevant_agents(agent_name: str, agent_description: str):
 
     query_vector = await embed_text(query=text)
 
-    async with AsyncOpenSearch(
-        hosts=[
-            {
-                "host": get_settings().OPENSEARCH_HOST,
-                "port": get_settings().OPENSEARCH_PORT,
+    body = {
+        "size": 3,
+        "query": {
+            "hybrid": {
+                "queries": [
+                    {
+                        "multi_match": {
+                            "query": text,
+                            "fields": ["agent_name^3", "search_text"],
+                        }
+                    },
+                    {"knn": {"embedding": {"vector": query_vector, "k": 3}}},
+                ]
             }
-        ],
-        http_auth=(
-            get_settings().OPENSEARCH_USERNAME,
-            get_settings().OPENSEARCH_PASSWORD,
-        ),
-        use_ssl=True,
-        verify_certs=False,
-        ssl_show_warn=False,
-    ) as client:
-        body = {
-            "size": 3,
-            "query": {
-                "hybrid": {
-                    "queries": [
-                        {
-                            "multi_match": {
-                                "query": text,
-                                "fields": ["agent_name^3", "search_text"],
-                            }
-                        },
-                        {"knn": {"embedding": {"vector": query_vector, "k": 3}}},
-                    ]
-                }
-            },
-        }
-        res = await client.search(
-            index="agents", body=body, params={"search_pipeline": "agent_team_rrf"}
-        )
-        return [hit["_source"]["raw"] for hit in res["hits"]["hits"]]
+        },
+    }
+    res = await search_index(
+        index="agents", body=body, params={"search_pipeline": "agent_team_rrf"}
+    )
+    return [hit["_source"]["raw"] for hit in res["hits"]["hits"]]
 
 
 # Agent Executor
 class AgentExecutor:
-    def __init__(self, app_name, session_service: InMemorySessionService, agent: Agent):
+    def __init__(
+        self, app_name, session_service: "InMemorySessionService", agent: "Agent"
+    ):
         self.app_name = app_name
         self.session_service = session_service
         self.agent = agent
 
     async def execute(self, message: AgentMessage):
+        from google.adk.runners import Runner
+        from google.genai import types
+
         session_id = message.session_id
         user_id = message.user_id
 
@@ -102,57 +96,238 @@ class AgentExecutor:
             new_message=content,
         )
 
-        # agent_response = {}
-        async for event in events:
-            # If u want to capture everything do it accordingly
-            if event.is_final_response():
-                return event.content.parts[0].text
+        # Closing the events on return / cancellation tears down the run
+        async with aclosing(events):
+            async for event in events:
+                # If u want to capture everything do it accordingly
+                if event.is_final_response():
+                    return event.content.parts[0].text
 
         # return agent_response
 
 
 # Run the remote agent
 async def run_remote_agent(
-    remote_agent: Agent, session_id: str, user_id: str, query: str
+    remote_agent: "Agent", session_id: str, user_id: str, query: str
 ):
+    from google.adk.sessions import InMemorySessionService
+
     session_service = InMemorySessionService()
     agent_runner = AgentExecutor(
         app_name="remote_agents", session_service=session_service, agent=remote_agent
     )
-    response = await agent_runner.execute(
-        message=AgentMessage(session_id=session_id, user_id=user_id, query=query)
-    )
+    # Model and tool calls of the run share one deadline
+    async with deadline(get_settings().REMOTE_AGENT_DEADLINE_SECONDS):
+        response = await agent_runner.execute(
+            message=AgentMessage(session_id=session_id, user_id=user_id, query=query)
+        )
     return response
 
 
-# Response is pushed to discord for now
-async def invoke_remote_agent(payload: Dict):
+# Tools hosted by this process are called in process, the rest go over http
+async def build_toolsets(required_tools: List[str]):
+    from google.adk.tools.mcp_tool import McpToolset, StreamableHTTPConnectionParams
+
+    from mcp_server.service.local_toolset import LocalToolset
+
+    local_tool_names = await get_local_tool_names()
+    local_tools = [tool for tool in required_tools if tool in local_tool_names]
+    remote_tools = [tool for tool in required_tools if tool not in local_tool_names]
+
+    toolsets = []
+    if local_tools:
+        toolsets.append(
+            LocalToolset(server=get_local_server(), tool_filter=local_tools)
+        )
+    if remote_tools:
+        url = get_settings().MCP_SERVER_URL
+        toolsets.append(
+            cassette_toolset(
+                McpToolset(
+                    connection_params=StreamableHTTPConnectionParams(url=url),
+                    tool_filter=remote_tools,
+                ),
+                url=url,
+            )
+        )
+    return toolsets
+
+
+# Build the agent described by the payload
+async def build_remote_agent(payload: Dict) -> "Agent":
+    from google.adk.agents.llm_agent import Agent
+
     # inializing all the env variable to env
     os.environ["GOOGLE_API_KEY"] = get_settings().GOOGLE_API_KEY
     os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = get_settings().GOOGLE_GENAI_USE_VERTEXAI
 
-    # Initalizing the toolset for the agent to access
-    toolset = McpToolset(
-        connection_params=StreamableHTTPConnectionParams(
-            url=get_settings().MCP_SERVER_URL
-        ),
-        tool_filter=payload["required_tools"],
-    )
+    # Initalizing the toolsets for the agent to access
+    toolsets = await build_toolsets(required_tools=payload["required_tools"])
 
     # Initalizing the agent itself to run the query
-    remote_agent = Agent(
+    return Agent(
         model="gemini-2.5-flash",
         name=payload["agent_name"].replace(" ", "_"),
         description=payload["agent_description"],
         instruction=payload["agent_instruction"],
-        tools=[toolset],
-    )
-    # Run the agent query
-    response = await run_remote_agent(
-        remote_agent=remote_agent,
-        session_id=uuid.uuid4().hex,
-        user_id=uuid.uuid4().hex,
-        query=payload["input_query"],
+        tools=toolsets,
+        before_model_callback=[apply_deadline, replay_model_call],
+        after_model_callback=record_model_call,
     )
+
+
+# Only the approved agent definition decides whether a run may be cached, the
+# caller can not opt in, nor add tools the approved agent does not have
+async def resolve_cacheable(payloads: List[Dict]):
+    agent_names = sorted({payload["agent_name"] for payload in payloads})
+    try:
+        sources = await get_documents(
+            index="agents",
+            doc_ids=agent_names,
+            source_includes=["raw.cacheable", "raw.tools"],
+        )
+    except Exception as exc:
+        logger.warning("Looking up cacheable agents failed: %r", exc)
+        sources = {}
+
+    for payload in payloads:
+        raw = sources.get(payload["agent_name"], {}).get("raw", {})
+        payload["cacheable"] = bool(raw.get("cacheable", False)) and set(
+            payload["required_tools"]
+        ) <= set(raw.get("tools", []))
+
+
+# Cached result of an opted in agent, None when not cacheable, missing or the
+# cache is unavailable
+async def get_cached_response(payload: Dict):
+    if not payload.get("cacheable", False):
+        return None
+    try:
+        return await get_agent_cache().get(agent_cache_key(payload))
+    except Exception as exc:
+        logger.warning("Agent cache lookup failed: %r", exc)
+        return None
+
+
+async def store_cached_response(payload: Dict, response: str):
+    if not payload.get("cacheable", False) or response is None:
+        return
+    try:
+        await get_agent_cache().set(agent_cache_key(payload), response)
+    except Exception as exc:
+        logger.warning("Agent cache write failed: %r", exc)
+
+
+def timed_out_message(payload: Dict):
+    seconds = get_settings().REMOTE_AGENT_DEADLINE_SECONDS
+    return f"{payload['agent_name']} timed out after {seconds:g}s"
+
+
+# A built remote agent owns its toolsets, closing them ends their MCP sessions
+# also when the run was cut short by its deadline or cancelled
+async def close_remote_agent(remote_agent: "Agent"):
+    for toolset in remote_agent.tools:
+        try:
+            await toolset.close()
+        except Exception as exc:
+            logger.warning("Closing a toolset of %s failed: %r", remote_agent.name, exc)
+
+
+# Response is pushed to discord for now
+async def invoke_remote_agent(payload: Dict):
+    await resolve_cacheable(payloads=[payload])
+    # Cache hits go straight to the channel
+    cached_response = await get_cached_response(payload=payload)
+    if cached_response is not None:
+        await send_agent_message(agent_response=cached_response)
+        return "Process Done"
+
+    remote_agent = await build_remote_agent(payload=payload)
+    # Run the agent query, a run past its deadline is reported instead of lost
+    try:
+        response = await run_remote_agent(
+            remote_agent=remote_agent,
+            session_id=uuid.uuid4().hex,
+            user_id=uuid.uuid4().hex,
+            query=payload["input_query"],
+        )
+    except TimeoutError:
+        await send_agent_message(agent_response=timed_out_message(payload))
+        return "Process Timed Out"
+    finally:
+        await close_remote_agent(remote_agent)
+    await store_cached_response(payload=payload, response=response)
     await send_agent_message(agent_response=response)
     return "Process Done"
+
+
+# Runs sharing the same definition share one constructed agent
+def agent_definition_key(payload: Dict):
+    return (
+        payload["agent_name"],
+        payload["agent_description"],
+        payload["agent_instruction"],
+        tuple(sorted(payload["required_tools"])),
+    )
+
+
+# Fan out many runs concurrently and push the results to discord together
+async def invoke_remote_agents(payloads: List[Dict], max_concurrency: int):
+    await resolve_cacheable(payloads=payloads)
+    responses = await asyncio.gather(
+        *(get_cached_response(payload=payload) for payload in payloads)
+    )
+
+    # Only runs that missed the cache need an agent, a definition that fails to
+    # build fails its own runs and leaves the rest of the batch alone
+    remote_agents = {}
+    build_errors = {}
+    for payload, response in zip(payloads, responses):
+        key = agent_definition_key(payload)
+        if response is not None or key in remote_agents or key in build_errors:
+            continue
+        try:
+            remote_agents[key] = await build_remote_agent(payload=payload)
+        except Exception as exc:
+            logger.warning("Building %s failed: %r", payload["agent_name"], exc)
+            build_errors[key] = exc
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(payload: Dict):
+        if agent_definition_key(payload) in build_errors:
+            raise build_errors[agent_definition_key(payload)]
+        async with semaphore:
+            response = await run_remote_agent(
+                remote_agent=remote_agents[agent_definition_key(payload)],
+                session_id=uuid.uuid4().hex,
+                user_id=uuid.uuid4().hex,
+                query=payload["input_query"],
+            )
+        await store_cached_response(payload=payload, response=response)
+        return response
+
+    # Runs of a batch share their agents, which are closed once at the end
+    missed = [index for index, response in enumerate(responses) if response is None]
+    try:
+        results = await asyncio.gather(
+            *(run(payloads[index]) for index in missed), return_exceptions=True
+        )
+    finally:
+        await asyncio.gather(
+            *(close_remote_agent(agent) for agent in remote_agents.values())
+        )
+    for index, result in zip(missed, results):
+        responses[index] = result
+
+    agent_responses = []
+    for payload, response in zip(payloads, responses):
+        if isinstance(response, TimeoutError):
+            response = timed_out_message(payload)
+        elif isinstance(response, Exception):
+            response = f"Failed: {response!r}"
+        agent_responses.append(
+            f"**{payload['agent_name']}** · {payload['input_query']}\n{response}"
+        )
+    await send_agent_messages(agent_responses=agent_responses)
+    return "Process Done"
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional
+
+from mcp_server.config.settings import get_settings
+
+
+# Same definition + tools + query (ignoring case and spacing) share a result
+def agent_cache_key(payload: Dict):
+    definition = json.dumps(
+        [
+            payload["agent_name"],
+            payload["agent_description"],
+            payload["agent_instruction"],
+        ]
+    )
+    key = {
+        "definition": hashlib.sha256(definition.encode("utf-8")).hexdigest(),
+        "required_tools": sorted(payload["required_tools"]),
+        "query": " ".join(payload["input_query"].split()).casefold(),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# In process LRU cache with a TTL per entry
+class MemoryAgentCache:
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Redis backed cache, survives restarts and is shared across replicas
+class RedisAgentCache:
+    def __init__(self, url: str, ttl_seconds: int, max_entries: int):
+        from redis.asyncio import Redis
+
+        self.client = Redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prefix = "agent_cache:"
+        # Sorted set of keys by write time, used to evict the oldest entries
+        self.index_key = f"{self.prefix}index"
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(f"{self.prefix}{key}")
+
+    async def set(self, key: str, value: str):
+        now = time.time()
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(f"{self.prefix}{key}", value, ex=self.ttl_seconds)
+            pipe.zadd(self.index_key, {key: now})
+            # Keys past their TTL are gone already, drop them from the index
+            # so they do not count towards max_entries
+            pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl_seconds)
+            pipe.zcard(self.index_key)
+            *_, size = await pipe.execute()
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = await self.client.zpopmin(self.index_key, overflow)
+            await self.client.delete(*[f"{self.prefix}{key}" for key, _ in evicted])
+
+
+@lru_cache
+def get_agent_cache():
+    settings = get_settings()
+    if settings.AGENT_CACHE_BACKEND == "redis":
+        return RedisAgentCache(
+            url=settings.REDIS_URL,
+            ttl_seconds=settings.AGENT_CACHE_TTL_SECONDS,
+            max_entries=settings.AGENT_CACHE_MAX_ENTRIES,
+        )
+    return MemoryAgentCache(
+        ttl_seconds=settings.AGENT_CACHE_TTL_SECONDS,
+        max_entries=settings.AGENT_CACHE_MAX_ENTRIES,
+    )
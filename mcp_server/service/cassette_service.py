@@ -0,0 +1,19 @@
+from mcp_server.config.settings import get_settings
+from shared.service.cassette_service import CassetteMiss, Cassettes
+
+# Cassettes of this service, see shared.service.cassette_service
+cassettes = Cassettes(get_settings=get_settings)
+
+cassette = cassettes.cassette
+cassette_toolset = cassettes.cassette_toolset
+replay_model_call = cassettes.replay_model_call
+record_model_call = cassettes.record_model_call
+
+__all__ = [
+    "CassetteMiss",
+    "cassette",
+    "cassette_toolset",
+    "cassettes",
+    "record_model_call",
+    "replay_model_call",
+]
@@ -2,16 +2,24 @@ from typing import List
 
 import aiohttp
 
+# Discord rejects messages longer than 2000 characters
+DISCORD_MESSAGE_LIMIT = 2000
+
 
 # Send the agent details to discord for approval
 async def send_message(
-    agent_name: str, agent_description: str, agent_instruction: str, tools: List[str]
+    agent_name: str,
+    agent_description: str,
+    agent_instruction: str,
+    tools: List[str],
+    cacheable: bool = False,
 ):
     data = {
         "agent_name": agent_name,
         "agent_description": agent_description,
         "agent_instruction": agent_instruction,
         "tools": tools,
+        "cacheable": cacheable,
     }
 
     async with aiohttp.ClientSession() as session:
@@ -34,3 +42,35 @@ async def send_agent_message(agent_response: str):
             url="http://localhost:8090/send_agent_response", json=data
         ) as response:
             return await response.json()
+
+
+# Pack many agent responses into as few discord messages as the limit allows
+def pack_agent_messages(agent_responses: List[str], limit: int = DISCORD_MESSAGE_LIMIT):
+    messages = []
+    current = ""
+    for response in agent_responses:
+        # A single response larger than the limit is split on its own
+        while len(response) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(response[:limit])
+            response = response[limit:]
+
+        candidate = f"{current}\n\n{response}" if current else response
+        if len(candidate) > limit:
+            messages.append(current)
+            candidate = response
+        current = candidate
+
+    if current:
+        messages.append(current)
+    return messages
+
+
+# Send a batch of agent responses as a short series of discord messages
+async def send_agent_messages(agent_responses: List[str]):
+    results = []
+    for message in pack_agent_messages(agent_responses=agent_responses):
+        results.append(await send_agent_message(agent_response=message))
+    return results
@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+from mcp_server.config.settings import get_settings
+from mcp_server.service.cassette_service import cassette
+from mcp_server.service.hedging_service import hedged
+
+
+# Ollama client, built on first use so importing the server stays cheap
+@lru_cache
+def get_ollama_client():
+    from ollama import AsyncClient
+
+    return AsyncClient()
+
+
+# Text Embedding function
+@cassette("embed_text")
+@hedged("embed_text")
+async def embed_text(query: str):
+    res = await get_ollama_client().embeddings(
+        model=get_settings().EMBEDDING_MODEL,
+        prompt=query,
+        keep_alive=get_settings().EMBEDDING_KEEP_ALIVE,
+    )
+    return res.embedding
+
+
+# Loads the embedding model and pins it so the first search does not pay for it
+async def pin_embedding_model():
+    await get_ollama_client().embeddings(
+        model=get_settings().EMBEDDING_MODEL,
+        prompt="warm up",
+        keep_alive=get_settings().EMBEDDING_KEEP_ALIVE,
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import time
+from collections import deque
+
+from mcp_server.config.settings import get_settings
+
+# Recent latencies kept per hedged call
+MAX_SAMPLES = 256
+
+
+# Latency tracker of one idempotent call. Once enough samples are in, a call
+# still running after the p95 latency gets a backup request and whichever
+# finishes first wins. Hedges are capped to a share of all calls so a slow
+# upstream does not see its load doubled.
+class Hedge:
+    def __init__(self, name: str):
+        self.name = name
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.calls = 0
+        self.hedges = 0
+
+    def delay(self):
+        settings = get_settings()
+        if len(self.samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        if self.hedges >= self.calls * settings.HEDGE_MAX_RATIO:
+            return None
+        samples = sorted(self.samples)
+        return samples[int(len(samples) * 0.95) - 1]
+
+    async def _timed(self, fn, *args, **kwargs):
+        started_at = time.perf_counter()
+        result = await fn(*args, **kwargs)
+        self.samples.append(time.perf_counter() - started_at)
+        return result
+
+    async def run(self, fn, *args, **kwargs):
+        self.calls += 1
+        delay = self.delay()
+        primary = asyncio.ensure_future(self._timed(fn, *args, **kwargs))
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(self._timed(fn, *args, **kwargs)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+_hedges = {}
+
+
+# Hedges an idempotent async call when HEDGING_ENABLED is set
+def hedged(name: str):
+    def decorator(fn):
+        hedge = _hedges.setdefault(name, Hedge(name=name))
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not get_settings().HEDGING_ENABLED:
+                return await fn(*args, **kwargs)
+            return await hedge.run(fn, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,15 +1,26 @@
 import base64
+from functools import lru_cache
 
 import aiofiles
-from openai import AsyncOpenAI
 
-client = AsyncOpenAI(
-    base_url="http://localhost:8091/v1",
-    api_key="",
-)
+from mcp_server.service.cassette_service import cassette
+from mcp_server.service.hedging_service import hedged
+
+
+# OCR client, built on first use so importing the server stays cheap
+@lru_cache
+def get_openai_client():
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        base_url="http://localhost:8091/v1",
+        api_key="",
+    )
 
 
 # Process the invoice and send that extracted data.
+@cassette("extract_invoice_details")
+@hedged("ocr")
 async def extract_invoice_details(image_path: str):
     async with aiofiles.open(image_path, mode="rb") as file:
         image_bytes = await file.read()
@@ -17,7 +28,7 @@ async def extract_invoice_details(image_path: str):
     image_bs4 = base64.b64encode(image_bytes).decode("utf-8")
     data_uri = f"data:image/png;base64,{image_bs4}"
 
-    response = await client.chat.completions.create(
+    response = await get_openai_client().chat.completions.create(
         model="tencent/HunyuanOCR",
         messages=[
             {
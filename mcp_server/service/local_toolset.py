@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import List, Optional
+
+import mcp.types
+from fastmcp import Client
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+
+
+# Calls a tool of the FastMCP server in this process over the in-memory client
+# transport: arguments are validated and converted (pydantic models, enums,
+# ...) by the server exactly like a call over McpToolset, and the response has
+# the same CallToolResult shape
+class LocalMcpTool(McpTool):
+    def __init__(self, toolset: "LocalToolset", mcp_tool: mcp.types.Tool):
+        super().__init__(mcp_tool=mcp_tool, mcp_session_manager=None)
+        self.toolset = toolset
+
+    async def _run_async_impl(self, *, args, tool_context, credential):
+        try:
+            client = await self.toolset.connect()
+            result = await client.call_tool_mcp(self.name, args)
+        except Exception as exc:
+            # The MCP server reports tool failures as an error result too
+            result = mcp.types.CallToolResult(
+                content=[mcp.types.TextContent(type="text", text=str(exc))],
+                isError=True,
+            )
+        return result.model_dump(exclude_none=True, mode="json")
+
+
+# Toolset backed by a FastMCP server in this process, skips the http session
+# round trip of McpToolset. One in-memory client session is opened on first
+# use and kept until the toolset is closed.
+class LocalToolset(BaseToolset):
+    def __init__(self, server, tool_filter: Optional[List[str]] = None):
+        super().__init__(tool_filter=tool_filter)
+        self.client = Client(server)
+        self._exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self._lock:
+            if not self.client.is_connected():
+                await self._exit_stack.enter_async_context(self.client)
+        return self.client
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None):
+        client = await self.connect()
+        tools = [LocalMcpTool(self, mcp_tool) for mcp_tool in await client.list_tools()]
+        return [
+            tool for tool in tools if self._is_tool_selected(tool, readonly_context)
+        ]
+
+    async def close(self):
+        async with self._lock:
+            await self._exit_stack.aclose()
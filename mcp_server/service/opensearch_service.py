@@ -0,0 +1,52 @@
+from typing import List
+
+from mcp_server.config.settings import get_settings
+from mcp_server.service.cassette_service import cassette
+from mcp_server.service.hedging_service import hedged
+
+
+# OpenSearch client, the sdk is imported on first use to keep startup fast
+def opensearch_client():
+    from opensearchpy import AsyncOpenSearch
+
+    return AsyncOpenSearch(
+        hosts=[
+            {
+                "host": get_settings().OPENSEARCH_HOST,
+                "port": get_settings().OPENSEARCH_PORT,
+            }
+        ],
+        http_auth=(
+            get_settings().OPENSEARCH_USERNAME,
+            get_settings().OPENSEARCH_PASSWORD,
+        ),
+        use_ssl=True,
+        verify_certs=False,
+        ssl_show_warn=False,
+    )
+
+
+# Search an index, wrapped so the exchange can be recorded / replayed
+@cassette("opensearch_search")
+@hedged("opensearch_search")
+async def search_index(index: str, body: dict, params: dict = None):
+    async with opensearch_client() as client:
+        return await client.search(index=index, body=body, params=params)
+
+
+# Sources of many documents by id in one _mget, keyed by id, missing skipped
+@cassette("opensearch_mget")
+async def get_documents(index: str, doc_ids: List[str], source_includes: List[str]):
+    async with opensearch_client() as client:
+        res = await client.mget(
+            index=index, body={"ids": doc_ids}, _source_includes=source_includes
+        )
+        return {doc["_id"]: doc["_source"] for doc in res["docs"] if doc.get("found")}
+
+
+# Loads the HNSW graphs of the indices into memory ahead of the first kNN query
+async def warm_up_knn(indices: List[str]):
+    async with opensearch_client() as client:
+        return await client.transport.perform_request(
+            "GET", f"/_plugins/_knn/warmup/{','.join(indices)}"
+        )
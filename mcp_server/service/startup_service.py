@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import logging
+
+from mcp_server.config.settings import get_settings
+from mcp_server.service.embedding_service import pin_embedding_model
+from mcp_server.service.opensearch_service import warm_up_knn
+
+logger = logging.getLogger(__name__)
+
+# Sdks the tools need at call time, imported in the background after startup
+HEAVY_MODULES = [
+    "google.adk.agents.llm_agent",
+    "google.adk.runners",
+    "google.adk.sessions",
+    "google.adk.tools.mcp_tool",
+    "google.genai.types",
+    "ollama",
+    "opensearchpy",
+    "openai",
+]
+# Indices searched with kNN by the tools
+KNN_INDICES = ["agents", "tools"]
+
+_ready = asyncio.Event()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def _import_heavy_modules():
+    for module in HEAVY_MODULES:
+        importlib.import_module(module)
+
+
+# Pins the embedding model and loads the kNN graphs, a failing step is logged
+# and retried on the next round rather than holding readiness back forever
+async def warm_up():
+    # Replays run offline, there is nothing to warm up
+    if get_settings().CASSETTE_MODE == "replay":
+        return
+
+    steps = {
+        "embedding model": pin_embedding_model(),
+        "knn graphs": warm_up_knn(indices=KNN_INDICES),
+    }
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            logger.warning("Warm-up of %s failed: %r", name, result)
+
+
+# Prepare the runtime off the event loop so liveness probes keep answering
+async def prepare_runtime():
+    await asyncio.to_thread(_import_heavy_modules)
+    await warm_up()
+    _ready.set()
+
+
+def warmup_interval():
+    settings = get_settings()
+    if settings.EMBEDDING_KEEP_ALIVE > 0:
+        return min(settings.WARMUP_INTERVAL_SECONDS, settings.EMBEDDING_KEEP_ALIVE / 2)
+    return settings.WARMUP_INTERVAL_SECONDS
+
+
+# Ready after the first warm-up, then re-warm periodically in case ollama
+# unloaded the model or the graphs were evicted
+async def keep_warm():
+    await prepare_runtime()
+    while True:
+        await asyncio.sleep(warmup_interval())
+        await warm_up()
@@ -0,0 +1,20 @@
+# FastMCP server hosting the tools of this process, registered by mcp_server.main
+_local_server = None
+
+
+def register_local_server(server):
+    global _local_server
+    _local_server = server
+
+
+def get_local_server():
+    return _local_server
+
+
+# Names of the tools that can be dispatched in process, only plain function
+# tools qualify (proxied / mounted tools still have to go over http)
+async def get_local_tool_names():
+    if _local_server is None:
+        return set()
+    tools = await _local_server.get_tools()
+    return {name for name, tool in tools.items() if hasattr(tool, "fn")}
@@ -0,0 +1,245 @@
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+# Record / replay of outbound calls (gemini, ollama, opensearch, ocr, mcp) so
+# production traces can be profiled offline. Agent runs themselves execute
+# for real, only their model calls and MCP requests are served from cassettes.
+#   CASSETTE_MODE=off|record|replay
+#   CASSETTE_DIR=<folder holding one <name>.jsonl.gz per wrapped call>
+#   CASSETTE_REPLAY_TIMING=original|zero
+
+# Appends of concurrent recordings to the same file must not interleave
+_record_lock = threading.Lock()
+# Model call of the current agent step waiting for its response. The before
+# and after model callbacks run in the same context, a call that fails or is
+# cancelled leaves nothing behind once its run ends.
+_pending_model_call: ContextVar[Optional[Tuple[str, float]]] = ContextVar(
+    "pending_model_call", default=None
+)
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+def _encode(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    raise TypeError(f"{type(value).__name__} can not be stored in a cassette")
+
+
+def _digest(key_args):
+    return hashlib.sha256(
+        json.dumps(key_args, default=_encode, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+# Function call ids are generated per run, they are left out of the key
+def _without_ids(value):
+    if isinstance(value, dict):
+        return {key: _without_ids(item) for key, item in value.items() if key != "id"}
+    if isinstance(value, list):
+        return [_without_ids(item) for item in value]
+    return value
+
+
+def _model_request_key(llm_request):
+    config = llm_request.config
+    return [
+        llm_request.model,
+        config.system_instruction if config else None,
+        sorted(llm_request.tools_dict),
+        _without_ids(
+            [
+                content.model_dump(mode="json", exclude_none=True)
+                for content in llm_request.contents
+            ]
+        ),
+    ]
+
+
+# Cassettes of one service, get_settings provides CASSETTE_MODE, CASSETTE_DIR
+# and CASSETTE_REPLAY_TIMING
+class Cassettes:
+    def __init__(self, get_settings: Callable):
+        self.get_settings = get_settings
+        self._replay_positions = Counter()
+        self._loaded = {}
+
+    def _path(self, name: str):
+        return Path(self.get_settings().CASSETTE_DIR) / f"{name}.jsonl.gz"
+
+    def _load(self, name: str):
+        if name not in self._loaded:
+            entries = defaultdict(list)
+            path = self._path(name)
+            if path.exists():
+                with gzip.open(path, "rt", encoding="utf-8") as file:
+                    for line in file:
+                        entry = json.loads(line)
+                        entries[entry["key"]].append(entry)
+            self._loaded[name] = entries
+        return self._loaded[name]
+
+    def _record(self, name: str, key: str, elapsed: float, response):
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(
+            {"key": key, "elapsed": round(elapsed, 4), "response": response},
+            default=_encode,
+            separators=(",", ":"),
+        )
+        with _record_lock, gzip.open(path, "at", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    # Writes a recording off the event loop
+    async def record(self, name: str, key: str, elapsed: float, response):
+        await asyncio.to_thread(self._record, name, key, elapsed, response)
+
+    # Identical calls are served in recorded order, the last one repeats
+    async def replay(self, name: str, key: str):
+        entries = self._load(name).get(key)
+        if not entries:
+            raise CassetteMiss(f"no recording in {self._path(name)} for {key}")
+        position = self._replay_positions[(name, key)]
+        self._replay_positions[(name, key)] += 1
+        entry = entries[min(position, len(entries) - 1)]
+        if self.get_settings().CASSETTE_REPLAY_TIMING == "original":
+            await asyncio.sleep(entry["elapsed"])
+        return entry["response"]
+
+    # Runs call() through the cassette name, key_args identify the request
+    async def run(self, name: str, key_args, call):
+        mode = self.get_settings().CASSETTE_MODE
+        if mode == "off":
+            return await call()
+
+        digest = _digest(key_args)
+        if mode == "replay":
+            return await self.replay(name=name, key=digest)
+
+        started_at = time.perf_counter()
+        response = await call()
+        await self.record(
+            name=name,
+            key=digest,
+            elapsed=time.perf_counter() - started_at,
+            response=response,
+        )
+        return response
+
+    # Wraps an async call, key picks the arguments that identify a request
+    def cassette(self, name: str, key=None):
+        def decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if self.get_settings().CASSETTE_MODE == "off":
+                    return await fn(*args, **kwargs)
+                return await self.run(
+                    name=name,
+                    key_args=key(*args, **kwargs) if key else [args, kwargs],
+                    call=lambda: fn(*args, **kwargs),
+                )
+
+            return wrapper
+
+        return decorator
+
+    # before_model_callback, last in the list so the key is the request as
+    # sent. Replays answer from the cassette, recordings remember the request.
+    async def replay_model_call(self, callback_context, llm_request):
+        mode = self.get_settings().CASSETTE_MODE
+        if mode == "off":
+            return None
+
+        digest = _digest(_model_request_key(llm_request))
+        if mode == "replay":
+            from google.adk.models.llm_response import LlmResponse
+
+            response = await self.replay(name="model_call", key=digest)
+            return LlmResponse.model_validate_json(json.dumps(response))
+
+        _pending_model_call.set((digest, time.perf_counter()))
+        return None
+
+    # after_model_callback, records the response of the remembered request
+    async def record_model_call(self, callback_context, llm_response):
+        pending = _pending_model_call.get()
+        if pending is None:
+            return None
+
+        _pending_model_call.set(None)
+        digest, started_at = pending
+        await self.record(
+            name="model_call",
+            key=digest,
+            elapsed=time.perf_counter() - started_at,
+            response=llm_response,
+        )
+        return None
+
+    # Routes the MCP requests of an McpToolset through cassettes when enabled
+    def cassette_toolset(self, toolset, url: str):
+        if self.get_settings().CASSETTE_MODE != "off":
+            toolset._mcp_session_manager = CassetteSessionManager(
+                cassettes=self, session_manager=toolset._mcp_session_manager, url=url
+            )
+        return toolset
+
+
+# MCP client session whose tool listing and tool calls go through cassettes,
+# replays never open a connection
+class CassetteSession:
+    def __init__(self, cassettes: Cassettes, session, url: str):
+        self.cassettes = cassettes
+        self.session = session
+        self.url = url
+
+    async def list_tools(self):
+        from mcp.types import ListToolsResult
+
+        async def call():
+            result = await self.session.list_tools()
+            return result.model_dump(mode="json", exclude_none=True)
+
+        response = await self.cassettes.run(
+            name="mcp_list_tools", key_args=[self.url], call=call
+        )
+        return ListToolsResult.model_validate(response)
+
+    async def call_tool(self, name: str, arguments=None):
+        from mcp.types import CallToolResult
+
+        async def call():
+            result = await self.session.call_tool(name, arguments=arguments)
+            return result.model_dump(mode="json", exclude_none=True)
+
+        response = await self.cassettes.run(
+            name="mcp_call_tool", key_args=[self.url, name, arguments], call=call
+        )
+        return CallToolResult.model_validate(response)
+
+
+class CassetteSessionManager:
+    def __init__(self, cassettes: Cassettes, session_manager, url: str):
+        self.cassettes = cassettes
+        self.session_manager = session_manager
+        self.url = url
+
+    async def create_session(self, headers=None):
+        session = None
+        if self.cassettes.get_settings().CASSETTE_MODE != "replay":
+            session = await self.session_manager.create_session(headers=headers)
+        return CassetteSession(cassettes=self.cassettes, session=session, url=self.url)
+
+    async def close(self):
+        await self.session_manager.close()
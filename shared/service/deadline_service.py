@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute deadline (event loop time) of the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+# Runs the block under a deadline, a nested deadline never extends an outer one.
+# Expiry cancels the block and raises TimeoutError
+@asynccontextmanager
+async def deadline(seconds: float):
+    when = asyncio.get_running_loop().time() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        when = min(when, outer)
+    token = _deadline.set(when)
+    try:
+        async with asyncio.timeout_at(when):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+# Seconds left before the current deadline, None when there is none
+def remaining():
+    when = _deadline.get()
+    if when is None:
+        return None
+    return max(0.0, when - asyncio.get_running_loop().time())
+
+
+# before_model_callback, caps the model http call at the time that is left
+def apply_deadline(callback_context, llm_request):
+    from google.genai import types
+
+    time_left = remaining()
+    if time_left is None:
+        return None
+    http_options = llm_request.config.http_options or types.HttpOptions()
+    http_options.timeout = max(1, int(time_left * 1000))
+    llm_request.config.http_options = http_options
+    return None
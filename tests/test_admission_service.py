@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.service.admission_service import AdmissionController, AdmissionRejected
+
+
+def make_controller(**overrides):
+    options = {
+        "max_in_flight": 1,
+        "min_in_flight": 1,
+        "max_per_user": 4,
+        "max_queue": 8,
+        "queue_timeout": 0.05,
+        "target_latency": 20,
+    }
+    return AdmissionController(**{**options, **overrides})
+
+
+def test_queue_timeout_releases_user_and_records_wait():
+    async def scenario():
+        controller = make_controller()
+        async with controller.admit(user_id="a"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.admit(user_id="b"):
+                    pass
+            assert rejected.value.reason == "timed out waiting in queue"
+            assert "b" not in controller.per_user
+            assert controller.queued == 0
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0
+    assert controller.per_user == {}
+    assert controller.rejected_total == 1
+    assert len(controller.wait_times) == 2
+    assert max(controller.wait_times) >= 0.05
+
+
+def test_cancel_while_queued_leaves_no_accounting_behind():
+    async def scenario():
+        controller = make_controller(queue_timeout=10)
+        async with controller.admit(user_id="a"):
+            waiter = asyncio.create_task(controller._acquire("b", "normal"))
+            await asyncio.sleep(0.01)
+            assert controller.queued == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert controller.queued == 0
+            assert "b" not in controller.per_user
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0
+    assert controller.per_user == {}
+
+
+def test_released_slot_goes_to_the_highest_priority_waiter():
+    async def scenario():
+        controller = make_controller(queue_timeout=10)
+        order = []
+
+        async def request(user_id, priority):
+            async with controller.admit(user_id=user_id, priority=priority):
+                order.append(user_id)
+
+        async with controller.admit(user_id="first"):
+            low = asyncio.create_task(request("low", "low"))
+            high = asyncio.create_task(request("high", "high"))
+            await asyncio.sleep(0.01)
+            assert controller.queued == 2
+        await asyncio.gather(low, high)
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    assert order == ["high", "low"]
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+
+
+def test_per_user_limit_rejects_without_queueing():
+    async def scenario():
+        controller = make_controller(max_in_flight=4, max_per_user=1)
+        async with controller.admit(user_id="a"):
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(user_id="a"):
+                    pass
+            assert controller.queued == 0
+            assert controller.per_user["a"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+from google.genai import types
+
+from app.service.compaction_service import (
+    SUMMARY_CHARS,
+    compact_contents,
+    estimate_tokens,
+    split_turns,
+)
+
+
+def build_turn(turn: int, response_size: int = 2000):
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"question {turn}")]),
+        types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        id=f"call-{turn}", name="search_agent", args={}
+                    )
+                )
+            ],
+        ),
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        id=f"call-{turn}",
+                        name="search_agent",
+                        response={"result": "x" * response_size},
+                    )
+                )
+            ],
+        ),
+        types.Content(role="model", parts=[types.Part(text=f"answer {turn}")]),
+    ]
+
+
+def build_history(turns: int, **kwargs):
+    return [content for turn in range(turns) for content in build_turn(turn, **kwargs)]
+
+
+def test_tool_responses_stay_in_the_turn_that_called_them():
+    turns = split_turns(build_history(3))
+    assert len(turns) == 3
+    assert all(len(turn) == 4 for turn in turns)
+
+
+def test_short_history_is_sent_verbatim():
+    history = build_history(3)
+    assert compact_contents(history, keep_turns=4, token_budget=100_000) == history
+
+
+def test_older_turns_are_merged_into_one_summary():
+    history = build_history(10)
+    sent = compact_contents(history, keep_turns=4, token_budget=100_000)
+
+    assert sent[1:] == history[-16:]
+    summary = sent[0].parts[0].text
+    assert summary.startswith("Summary of the 6 earlier turns")
+    assert "question 0" in summary and "answer 5" in summary
+    assert "search_agent" in summary
+    assert len(sent) == 17
+
+
+def test_prompt_stops_growing_after_keep_turns():
+    sizes = [
+        estimate_tokens(
+            compact_contents(build_history(turns), keep_turns=4, token_budget=100_000)
+        )
+        for turns in (50, 100, 200)
+    ]
+    assert max(sizes) - min(sizes) < SUMMARY_CHARS // 4
+
+
+def test_turns_over_the_budget_are_cut_but_the_current_turn_is_kept():
+    history = build_history(6, response_size=8000)
+    current_turn_tokens = estimate_tokens(history[-4:])
+    sent = compact_contents(history, keep_turns=4, token_budget=current_turn_tokens)
+
+    assert sent[-4:] == history[-4:]
+    assert estimate_tokens(sent) <= current_turn_tokens
+
+
+def test_recent_turn_over_the_budget_is_compacted_before_it_is_dropped():
+    history = build_history(2, response_size=8000)
+    budget = estimate_tokens(history[-4:]) + 200
+    sent = compact_contents(history, keep_turns=4, token_budget=budget)
+
+    assert sent[-4:] == history[-4:]
+    compacted = sent[2].parts[0].function_response.response
+    assert compacted["compacted"] is True
+    assert estimate_tokens(sent) <= budget
@@ -0,0 +1,25 @@
+from mcp_server.service.discord_service import pack_agent_messages
+
+
+def test_small_responses_share_one_message():
+    assert pack_agent_messages(["a", "b", "c"], limit=20) == ["a\n\nb\n\nc"]
+
+
+def test_new_message_starts_when_the_limit_is_reached():
+    messages = pack_agent_messages(["a" * 8, "b" * 8, "c" * 8], limit=20)
+    assert messages == ["a" * 8 + "\n\n" + "b" * 8, "c" * 8]
+    assert all(len(message) <= 20 for message in messages)
+
+
+def test_response_over_the_limit_is_split_on_its_own():
+    messages = pack_agent_messages(["a", "b" * 25, "c"], limit=10)
+    assert messages == ["a", "b" * 10, "b" * 10, "b" * 5 + "\n\nc"]
+    assert all(len(message) <= 10 for message in messages)
+
+
+def test_response_of_exactly_the_limit_fits():
+    assert pack_agent_messages(["a" * 10], limit=10) == ["a" * 10]
+
+
+def test_no_responses_no_messages():
+    assert pack_agent_messages([]) == []
@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server.service import hedging_service
+from mcp_server.service.hedging_service import Hedge
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = SimpleNamespace(HEDGE_MIN_SAMPLES=5, HEDGE_MAX_RATIO=1.0)
+    monkeypatch.setattr(hedging_service, "get_settings", lambda: settings)
+    return settings
+
+
+def warmed_up_hedge(latency: float = 0.01):
+    hedge = Hedge(name="test")
+    hedge.samples.extend([latency] * 10)
+    hedge.calls = 10
+    return hedge
+
+
+def test_no_hedge_before_enough_samples():
+    hedge = Hedge(name="test")
+    hedge.samples.extend([0.01] * 4)
+    assert hedge.delay() is None
+
+
+def test_hedges_are_capped_to_a_share_of_calls(settings):
+    settings.HEDGE_MAX_RATIO = 0.1
+    hedge = warmed_up_hedge()
+    hedge.hedges = 1
+    assert hedge.delay() is None
+
+
+def test_backup_wins_when_the_primary_is_slow():
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        await asyncio.sleep(1 if len(calls) == 1 else 0)
+        return f"call {len(calls) - 1}"
+
+    hedge = warmed_up_hedge()
+    result = asyncio.run(hedge.run(call))
+    assert result == "call 1"
+    assert hedge.hedges == 1
+
+
+def test_fast_primary_is_not_hedged():
+    async def call():
+        return "primary"
+
+    hedge = warmed_up_hedge(latency=1)
+    assert asyncio.run(hedge.run(call)) == "primary"
+    assert hedge.hedges == 0
+
+
+def test_failed_backup_falls_back_to_the_primary():
+    calls = []
+
+    async def call():
+        calls.append(None)
+        if len(calls) == 2:
+            raise ConnectionError("backup failed")
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    hedge = warmed_up_hedge()
+    assert asyncio.run(hedge.run(call)) == "primary"
+
+
+def test_error_is_raised_when_both_fail():
+    async def call():
+        await asyncio.sleep(0.05)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(warmed_up_hedge().run(call))